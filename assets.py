@@ -0,0 +1,104 @@
+import os
+import json
+import pygame as pg
+
+ASSET_ATLAS_FILE = "assets/atlas.png"
+ASSET_ATLAS_INDEX = "assets/atlas.json"
+ATLAS_WIDTH = 1024
+ATLAS_PADDING = 1
+
+def display_ready():
+    return pg.display.get_init() and pg.display.get_surface() is not None
+
+class AssetManager:
+    def __init__(self):
+        self.images = {}
+        self.atlas = None
+        self.atlas_regions = {}
+        self.loads = 0
+        self.scales = 0
+        self.hits = 0
+
+    def load_atlas(self, atlas_path=ASSET_ATLAS_FILE, index_path=ASSET_ATLAS_INDEX):
+        if not (os.path.exists(atlas_path) and os.path.exists(index_path)):
+            return False
+        try:
+            with open(index_path, encoding='utf-8') as index_file:
+                index = json.load(index_file)
+            atlas = pg.image.load(atlas_path)
+        except (OSError, ValueError, pg.error) as e:
+            print(f"Could not load asset atlas {atlas_path}: {e}")
+            return False
+        if display_ready():
+            atlas = atlas.convert_alpha()
+        self.atlas = atlas
+        self.atlas_regions = {}
+        for entry in index["entries"]:
+            size = tuple(entry["size"]) if entry["size"] else None
+            self.atlas_regions[(entry["path"], size)] = pg.Rect(entry["rect"])
+        self.images = {}
+        print(f"Loaded asset atlas {atlas_path} ({len(self.atlas_regions)} images)")
+        return True
+
+    def get(self, path, size=None):
+        key = (path, tuple(size) if size else None)
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+        region = self.atlas_regions.get(key)
+        if region is not None:
+            image = self.atlas.subsurface(region)
+        elif key[1] is None:
+            image = pg.image.load(path)
+            if display_ready():
+                image = image.convert_alpha()
+            self.loads += 1
+        else:
+            image = pg.transform.scale(self.get(path), key[1])
+            self.scales += 1
+        self.images[key] = image
+        return image
+
+    def get_scaled_by(self, path, scale):
+        original = self.get(path)
+        return self.get(path, (int(original.get_width() * scale), int(original.get_height() * scale)))
+
+    def get_stats(self):
+        return {"images": len(self.images), "loads": self.loads, "scales": self.scales, "hits": self.hits,
+                "atlas_regions": len(self.atlas_regions)}
+
+    def build_atlas(self, atlas_path=ASSET_ATLAS_FILE, index_path=ASSET_ATLAS_INDEX, width=ATLAS_WIDTH):
+        keys = sorted(self.images, key=lambda key: (-self.images[key].get_height(), key[0], key[1] or ()))
+        entries = []
+        x = y = shelf_height = 0
+        for key in keys:
+            image_width, image_height = self.images[key].get_size()
+            if x + image_width > width:
+                x = 0
+                y += shelf_height + ATLAS_PADDING
+                shelf_height = 0
+            entries.append((key, pg.Rect(x, y, image_width, image_height)))
+            x += image_width + ATLAS_PADDING
+            shelf_height = max(shelf_height, image_height)
+
+        atlas = pg.Surface((width, y + shelf_height), pg.SRCALPHA)
+        for key, rect in entries:
+            atlas.blit(self.images[key], rect, special_flags=pg.BLEND_RGBA_MAX)
+        pg.image.save(atlas, atlas_path)
+        with open(index_path, 'w', encoding='utf-8') as index_file:
+            json.dump({"entries": [{"path": path, "size": list(size) if size else None, "rect": list(rect)}
+                                   for (path, size), rect in entries]}, index_file, indent=2)
+        print(f"Wrote {atlas_path} ({width}x{y + shelf_height}, {len(entries)} images) and {index_path}")
+
+assets = AssetManager()
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import main
+
+    main.reset_game()
+    builder = AssetManager()
+    for path, size in list(main.assets.images):
+        builder.get(path, size)
+    builder.build_atlas()
@@ -0,0 +1,199 @@
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import platform
+import statistics
+import time
+from game_engine import (WIDTH, HEIGHT, ITEM_SPAWN_INTERVAL, ITEM_SPAWN_X_RANGE, PLAYER_MOVE_SPEED, PLAYER_ROTATE_SPEED,
+                         PLAYER_SPEED_REFERENCE_RATE, SIMULATION_RATE, MATCH_TIME_SECONDS, DEFAULT_PLAYER_COUNT, Match)
+from match_bots import GreedyBot, RandomBot
+
+BATCH_OUTPUT = "batch_results.json"
+BATCH_MATCHES_PER_POINT = 100
+BATCH_CHUNK_SIZE = 10
+BATCH_SEED = 1
+BATCH_PROGRESS_INTERVAL = 5.0
+
+# speeds are per 60 Hz frame like PLAYER_MOVE_SPEED; spawn_half_size is the half width of the item spawn square
+PARAMETER_DEFAULTS = {
+    "spawn_interval": ITEM_SPAWN_INTERVAL,
+    "move_speed": PLAYER_MOVE_SPEED,
+    "rotate_speed": PLAYER_ROTATE_SPEED,
+    "spawn_half_size": (ITEM_SPAWN_X_RANGE[1] - ITEM_SPAWN_X_RANGE[0]) // 2,
+    "match_seconds": MATCH_TIME_SECONDS,
+    "players": DEFAULT_PLAYER_COUNT,
+}
+INPUT_BOTS = {"greedy": GreedyBot, "random": RandomBot}
+
+def parse_grid(grid_args):
+    grid = {}
+    for grid_arg in grid_args:
+        name, _, values = grid_arg.partition("=")
+        if name not in PARAMETER_DEFAULTS or not values:
+            raise SystemExit(f"Bad --grid {grid_arg!r}, expected one of {', '.join(PARAMETER_DEFAULTS)}=v1,v2,...")
+        cast = type(PARAMETER_DEFAULTS[name])
+        grid[name] = [cast(value) for value in values.split(",")]
+    return grid
+
+def grid_points(grid):
+    names = list(grid)
+    points = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(PARAMETER_DEFAULTS)
+        params.update(zip(names, values))
+        points.append(params)
+    return points
+
+def match_kwargs(params):
+    half_size = params["spawn_half_size"]
+    speed_scale = PLAYER_SPEED_REFERENCE_RATE / SIMULATION_RATE
+    return {
+        "match_time_seconds": params["match_seconds"],
+        "player_count": params["players"],
+        "item_spawn_interval": params["spawn_interval"],
+        "item_spawn_area": ((WIDTH // 2 - half_size, WIDTH // 2 + half_size),
+                            (HEIGHT // 2 - half_size, HEIGHT // 2 + half_size)),
+        "player_move_speed": params["move_speed"] * speed_scale,
+        "player_rotate_speed": params["rotate_speed"] * speed_scale,
+    }
+
+def make_input_callback(inputs, seed):
+    if inputs in INPUT_BOTS:
+        return INPUT_BOTS[inputs](seed)
+    from match_recording import MatchReplay
+    return MatchReplay(inputs).input_callback
+
+def play_matches(task):
+    point_index, params, seeds, inputs, item_store = task
+    item_list_class = None
+    if item_store == "arrays":
+        from item_arrays import ItemArrayStore
+        item_list_class = ItemArrayStore
+
+    results = []
+    start = time.perf_counter()
+    for seed in seeds:
+        match = Match(item_list=item_list_class() if item_list_class else None, seed=seed, **match_kwargs(params))
+        match.run(make_input_callback(inputs, seed))
+        results.append((seed, match.get_scores(), match.tick_count))
+    return point_index, results, time.perf_counter() - start
+
+def summarize_scores(values):
+    ordered = sorted(values)
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+    return {
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.pstdev(ordered),
+        "min": ordered[0],
+        "p10": percentile(10),
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "max": ordered[-1],
+    }
+
+def summarize_point(params, results, busy_seconds):
+    scores = [result[1] for result in results]
+    totals = [sum(match_scores) for match_scores in scores]
+    team_scores = [(sum(match_scores[0::2]), sum(match_scores[1::2])) for match_scores in scores]
+    histogram = {}
+    for total in totals:
+        histogram[total] = histogram.get(total, 0) + 1
+    return {
+        "params": params,
+        "matches": len(results),
+        "total_score": summarize_scores(totals),
+        "player_scores": [summarize_scores([match_scores[index] for match_scores in scores])
+                          for index in range(params["players"])],
+        "team_results": {
+            "left_wins": sum(1 for left, right in team_scores if left > right) / len(team_scores),
+            "right_wins": sum(1 for left, right in team_scores if right > left) / len(team_scores),
+            "draws": sum(1 for left, right in team_scores if left == right) / len(team_scores),
+            "mean_gap": statistics.fmean(abs(left - right) for left, right in team_scores),
+        },
+        "total_score_histogram": {str(total): histogram[total] for total in sorted(histogram)},
+        "ticks": sum(result[2] for result in results),
+        "matches_per_second_per_worker": len(results) / busy_seconds if busy_seconds else 0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless matches across a process pool and sweep parameters")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2",
+                        help=f"sweep a parameter ({', '.join(PARAMETER_DEFAULTS)}); repeat for a grid")
+    parser.add_argument("-n", "--matches", type=int, default=BATCH_MATCHES_PER_POINT, help="matches per grid point")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--inputs", default="greedy", help="greedy, random or a .ggr recording to replay")
+    parser.add_argument("--item-store", choices=("sprites", "arrays"), default="sprites")
+    parser.add_argument("--seed", type=int, help="first match seed; every grid point uses the same seeds "
+                                                 "(default: the recording's seed, or 1)")
+    parser.add_argument("--chunk", type=int, default=BATCH_CHUNK_SIZE, help="matches per worker task")
+    parser.add_argument("-o", "--output", default=BATCH_OUTPUT)
+    args = parser.parse_args()
+
+    if args.inputs not in INPUT_BOTS and not os.path.exists(args.inputs):
+        raise SystemExit(f"--inputs must be {', '.join(INPUT_BOTS)} or an existing recording")
+    if args.seed is None:
+        args.seed = BATCH_SEED
+        if args.inputs not in INPUT_BOTS:
+            from match_recording import MatchReplay
+            args.seed = MatchReplay(args.inputs).seed
+
+    points = grid_points(parse_grid(args.grid))
+    seeds = list(range(args.seed, args.seed + args.matches))
+    tasks = [(point_index, params, seeds[offset:offset + args.chunk], args.inputs, args.item_store)
+             for point_index, params in enumerate(points)
+             for offset in range(0, len(seeds), args.chunk)]
+    total_matches = len(points) * len(seeds)
+    print(f"Playing {total_matches} matches ({len(points)} grid points x {len(seeds)}) on {args.jobs} workers")
+
+    point_results = [[] for _ in points]
+    busy_seconds = [0.0] * len(points)
+    done = 0
+    start = last_progress = time.perf_counter()
+    with multiprocessing.Pool(args.jobs) as pool:
+        for point_index, results, elapsed in pool.imap_unordered(play_matches, tasks):
+            point_results[point_index].extend(results)
+            busy_seconds[point_index] += elapsed
+            done += len(results)
+            now = time.perf_counter()
+            if now - last_progress >= BATCH_PROGRESS_INTERVAL or done == total_matches:
+                last_progress = now
+                print(f"{done}/{total_matches} matches, {done / (now - start):.1f} matches/s")
+    elapsed = time.perf_counter() - start
+
+    summaries = []
+    for params, results, busy in zip(points, point_results, busy_seconds):
+        results.sort()
+        summaries.append(summarize_point(params, results, busy))
+        varied = {name: value for name, value in params.items() if value != PARAMETER_DEFAULTS[name]} or "defaults"
+        total_score = summaries[-1]["total_score"]
+        print(f"{varied}: total score p50 {total_score['p50']} mean {total_score['mean']:.2f} "
+              f"stdev {total_score['stdev']:.2f}, mean gap {summaries[-1]['team_results']['mean_gap']:.2f}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "jobs": args.jobs,
+            "inputs": args.inputs,
+            "item_store": args.item_store,
+            "first_seed": args.seed,
+            "matches": total_matches,
+            "elapsed_seconds": elapsed,
+            "matches_per_second": total_matches / elapsed if elapsed else 0,
+        },
+        "points": summaries,
+    }
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Wrote {args.output} ({total_matches / elapsed:.1f} matches/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import gc
+import json
+import platform
+import random
+import socket
+import time
+import pygame as pg
+
+BENCHMARK_OUTPUT = "benchmark_results.json"
+BENCHMARK_SEED = 1234
+BENCHMARK_REPEAT = 300
+BENCHMARK_WARMUP = 20
+LARGE_ITEM_COUNT = 2000
+SCORE_BURST_SIZE = 200
+REGRESSION_THRESHOLD = 1.10
+
+benchmarks = []
+
+def benchmark(func):
+    benchmarks.append(func)
+    return func
+
+def measure(setup, run, repeat, warmup=BENCHMARK_WARMUP):
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        for i in range(warmup + repeat):
+            state = setup()
+            start = time.perf_counter_ns()
+            run(state)
+            elapsed = time.perf_counter_ns() - start
+            if i >= warmup:
+                samples.append(elapsed)
+    finally:
+        gc.enable()
+    return samples
+
+def summarize(samples):
+    ordered = sorted(samples)
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] / 1000
+    return {
+        "unit": "us",
+        "samples": len(ordered),
+        "min": ordered[0] / 1000,
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": ordered[-1] / 1000,
+        "mean": sum(ordered) / len(ordered) / 1000,
+    }
+
+def no_setup():
+    return None
+
+def new_match(item_count=0, item_list=None, player_count=2):
+    from game_engine import Match, ITEM_SPAWN_X_RANGE, ITEM_SPAWN_Y_RANGE
+    match = Match(item_list=item_list, seed=BENCHMARK_SEED, player_count=player_count)
+    rng = random.Random(BENCHMARK_SEED)
+    for _ in range(item_count):
+        match.item_list.spawn_item(rng.randint(*ITEM_SPAWN_X_RANGE), rng.randint(*ITEM_SPAWN_Y_RANGE))
+    match.item_list.pop_changed_rects()
+    return match
+
+def random_controls(rng):
+    from game_engine import PLAYER_TICK_MOVE_SPEED, PLAYER_TICK_ROTATE_SPEED
+    return (rng.uniform(-PLAYER_TICK_MOVE_SPEED, PLAYER_TICK_MOVE_SPEED),
+            rng.uniform(-PLAYER_TICK_MOVE_SPEED, PLAYER_TICK_MOVE_SPEED),
+            rng.uniform(-PLAYER_TICK_ROTATE_SPEED, PLAYER_TICK_ROTATE_SPEED))
+
+@benchmark
+def player_update(repeat):
+    match = new_match()
+    rng = random.Random(BENCHMARK_SEED)
+    return measure(lambda: random_controls(rng), lambda controls: match.players[0].update(*controls), repeat)
+
+@benchmark
+def gripper_update(repeat):
+    match = new_match()
+    rng = random.Random(BENCHMARK_SEED)
+
+    def setup():
+        match.players[0].update(*random_controls(rng))
+
+    return measure(setup, lambda state: match.grippers[0].update(match.players[0]), repeat)
+
+def match_step_benchmark(repeat, player_count):
+    match = new_match(LARGE_ITEM_COUNT // 10, player_count=player_count)
+    rng = random.Random(BENCHMARK_SEED)
+
+    def setup():
+        return [random_controls(rng) + (rng.random() < 0.05,) for _ in range(player_count)]
+
+    return measure(setup, lambda controls: match.step(*controls), repeat)
+
+@benchmark
+def match_step(repeat):
+    return match_step_benchmark(repeat, 2)
+
+@benchmark
+def match_step_8_players(repeat):
+    return match_step_benchmark(repeat, 8)
+
+@benchmark
+def rollback_resimulate(repeat):
+    from netplay import NETPLAY_MAX_ROLLBACK
+    match = new_match(LARGE_ITEM_COUNT // 10)
+    rng = random.Random(BENCHMARK_SEED)
+    inputs = [[random_controls(rng) + (rng.random() < 0.05,) for _ in range(2)] for _ in range(NETPLAY_MAX_ROLLBACK)]
+    saved = match.save_state()
+
+    def run(state):
+        match.restore_state(saved)
+        for controls in inputs:
+            match.save_state()
+            match.step(*controls)
+
+    return measure(no_setup, run, repeat)
+
+def grip_action_benchmark(repeat, item_list):
+    match = new_match(LARGE_ITEM_COUNT, item_list)
+    gripper = match.grippers[0]
+    item_rect = pg.Rect(0, 0, 1, 1)
+
+    def setup():
+        if not gripper.has_item:
+            if isinstance(match.item_list, pg.sprite.AbstractGroup):
+                item_rect.center = next(iter(match.item_list)).rect.center
+            else:
+                index = int(match.item_list.alive[:match.item_list.count].argmax())
+                item_rect.center = (int(match.item_list.left[index]) + match.item_list.size // 2,
+                                    int(match.item_list.top[index]) + match.item_list.size // 2)
+            gripper.rect.center = item_rect.center
+        gripper.set_key_pressed()
+
+    return measure(setup, lambda state: gripper.handle_grip_action(match.item_list), repeat)
+
+@benchmark
+def handle_grip_action(repeat):
+    return grip_action_benchmark(repeat, None)
+
+@benchmark
+def handle_grip_action_arrays(repeat):
+    from item_arrays import ItemArrayStore
+    return grip_action_benchmark(repeat, ItemArrayStore())
+
+def basket_benchmark(repeat, item_list):
+    match = new_match(LARGE_ITEM_COUNT, item_list)
+    basket = match.baskets[0]
+
+    def setup():
+        for offset in range(5):
+            match.item_list.spawn_item(basket.rect.centerx, basket.rect.top + 10 + offset * 10)
+
+    return measure(setup, lambda state: basket.update(match.item_list), repeat)
+
+@benchmark
+def basket_update(repeat):
+    return basket_benchmark(repeat, None)
+
+@benchmark
+def basket_update_arrays(repeat):
+    from item_arrays import ItemArrayStore
+    return basket_benchmark(repeat, ItemArrayStore())
+
+@benchmark
+def joystick_lookup(repeat):
+    import main
+    from serial_input import axis_field_count
+    tables = main.joystick_calibration.tables[:axis_field_count(10)]
+
+    def run(state):
+        for value in range(1024):
+            for table in tables:
+                table[value]
+
+    return measure(no_setup, run, repeat)
+
+@benchmark
+def joystick_calibration_compile(repeat):
+    import main
+    from serial_input import axis_field_count
+    calibration = main.joystick_calibration
+    return measure(no_setup, lambda state: calibration.compile_tables(calibration.axes, axis_field_count(10)), repeat)
+
+def playing_frame_benchmark(repeat, dirty_rects):
+    import main
+    from game_engine import GameState
+    main.reset_game()
+    main.game_state_manager.set_state(GameState.PLAYING)
+    main.match = new_match(LARGE_ITEM_COUNT // 10)
+    main.playfield_renderer.bake_background(main.match.background_sprites)
+    rng = random.Random(BENCHMARK_SEED)
+
+    def setup():
+        main.match.step(random_controls(rng) + (rng.random() < 0.05,),
+                        random_controls(rng) + (rng.random() < 0.05,))
+
+    def run(state):
+        if dirty_rects:
+            update_rects = main.playfield_renderer.draw(main.screen, main.match.item_list, main.match.player_sprites,
+                                                        main.draw_playfield_overlays, 0.5)
+            if update_rects is None:
+                pg.display.flip()
+            else:
+                pg.display.update(update_rects)
+        else:
+            main.screen.fill(main.COLOR_DICT["LightGray"])
+            main.match.background_sprites.draw(main.screen)
+            main.match.item_list.draw(main.screen)
+            main.draw_interpolated_sprites(main.screen, main.match.player_sprites, 0.5)
+            main.draw_playfield_overlays(main.screen)
+            pg.display.flip()
+
+    return measure(setup, run, repeat)
+
+@benchmark
+def playing_frame_dirty(repeat):
+    return playing_frame_benchmark(repeat, True)
+
+@benchmark
+def playing_frame_full(repeat):
+    return playing_frame_benchmark(repeat, False)
+
+@benchmark
+def scoreboard_draw_high_scores(repeat):
+    import scoreboard
+    scores = [(random.Random(i).randint(0, 60), f"2026-01-01 12:00:{i:02d}") for i in range(scoreboard.HIGH_SCORES_LIMIT)]
+    scores.sort(reverse=True)
+    return measure(no_setup, lambda state: scoreboard.draw_high_scores(scoreboard.screen, scores), repeat)
+
+@benchmark
+def scoreboard_receive_burst(repeat):
+    import scoreboard
+    burst = b''.join(json.dumps({"score": i % 60, "timestamp": "2026-01-01 12:00:00", "seq": i}).encode('utf-8') + b'\n'
+                     for i in range(SCORE_BURST_SIZE))
+    sender, receiver = socket.socketpair()
+    decoder = scoreboard.ScoreStreamDecoder()
+
+    def setup():
+        sender.sendall(burst)
+
+    def run(state):
+        received = 0
+        while received < len(burst):
+            received += decoder.recv_from(receiver)
+            frames = decoder.pop_frames()
+            scoreboard.decode_frames(frames)
+            for frame in frames:
+                frame.release()
+
+    try:
+        return measure(setup, run, repeat)
+    finally:
+        sender.close()
+        receiver.close()
+
+def compare_results(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)["benchmarks"]
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        ratio = stats["p50"] / baseline[name]["p50"] if baseline[name]["p50"] else 0
+        flag = "  REGRESSION" if ratio > REGRESSION_THRESHOLD else ""
+        print(f"{name:32} p50 {baseline[name]['p50']:10.1f} -> {stats['p50']:10.1f} us ({ratio:.2f}x){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the game's hot paths")
+    parser.add_argument("-o", "--output", default=BENCHMARK_OUTPUT)
+    parser.add_argument("-n", "--repeat", type=int, default=BENCHMARK_REPEAT)
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--compare", help="baseline JSON file to compare p50 against")
+    args = parser.parse_args()
+
+    pg.init()
+    results = {}
+    for func in benchmarks:
+        if args.filter not in func.__name__:
+            continue
+        results[func.__name__] = summarize(func(args.repeat))
+        stats = results[func.__name__]
+        print(f"{func.__name__:32} p50 {stats['p50']:10.1f} us  p99 {stats['p99']:10.1f} us  max {stats['max']:10.1f} us")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "python": platform.python_version(),
+            "pygame": pg.version.ver,
+            "platform": platform.platform(),
+            "video_driver": pg.display.get_driver(),
+            "repeat": args.repeat,
+        },
+        "benchmarks": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        regressions = compare_results(results, args.compare)
+        if regressions:
+            raise SystemExit(f"Slower than baseline: {', '.join(regressions)}")
+
+    pg.quit()
+
+if __name__ == "__main__":
+    main()
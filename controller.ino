@@ -16,10 +16,19 @@ bool player2_ready_state = false;
 bool player2_grab_state = false;
 
 unsigned long last_send_time = 0;
-const int send_interval = 20;
+const int csv_send_interval = 20;
+const int binary_send_interval = 5;
+int send_interval = csv_send_interval;
+
+// Binary frame: sync, sequence, 6 x 10-bit axes + 4 button bits (64 bits), checksum
+const byte FRAME_SYNC = 0xA5;
+const int FRAME_SIZE = 11;
+bool binary_mode = false;
+byte frame_seq = 0;
 
 void setup() {
   Serial.begin(115200);
+  Serial.println("GRABBING_CONTROLLER 1");
 
   pinMode(player1_ready_btn_pin, INPUT_PULLUP);
   pinMode(player1_grab_btn_pin, INPUT_PULLUP);
@@ -27,7 +36,41 @@ void setup() {
   pinMode(player2_grab_btn_pin, INPUT_PULLUP);
 }
 
+void checkProtocolRequest() {
+  while (Serial.available() > 0) {
+    char request = Serial.read();
+    if (request == 'B') {
+      binary_mode = true;
+      send_interval = binary_send_interval;
+    } else if (request == 'C') {
+      binary_mode = false;
+      send_interval = csv_send_interval;
+    }
+  }
+}
+
+void sendBinaryFrame(int axes[6], byte buttons) {
+  uint64_t packed = 0;
+  for (int i = 0; i < 6; i++) {
+    packed |= ((uint64_t)(axes[i] & 0x3FF)) << (i * 10);
+  }
+  packed |= ((uint64_t)(buttons & 0x0F)) << 60;
+
+  byte frame[FRAME_SIZE];
+  frame[0] = FRAME_SYNC;
+  frame[1] = frame_seq++;
+  byte checksum = frame[1];
+  for (int i = 0; i < 8; i++) {
+    frame[2 + i] = (packed >> (i * 8)) & 0xFF;
+    checksum += frame[2 + i];
+  }
+  frame[FRAME_SIZE - 1] = checksum;
+  Serial.write(frame, FRAME_SIZE);
+}
+
 void loop() {
+  checkProtocolRequest();
+
   if (millis() - last_send_time >= send_interval) {
     last_send_time = millis();
 
@@ -44,6 +87,15 @@ void loop() {
     player2_ready_state = !digitalRead(player2_ready_btn_pin);
     player2_grab_state = !digitalRead(player2_grab_btn_pin);
 
+    if (binary_mode) {
+      int axes[6] = {player1_joy_x, player1_joy_y, player1_joy_rotate,
+                     player2_joy_x, player2_joy_y, player2_joy_rotate};
+      byte buttons = player1_ready_state | (player1_grab_state << 1) |
+                     (player2_ready_state << 2) | (player2_grab_state << 3);
+      sendBinaryFrame(axes, buttons);
+      return;
+    }
+
     Serial.print(player1_joy_x);
     Serial.print(",");
     Serial.print(player1_joy_y);
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import math
+import argparse
+from serial_input import encode_binary_frame, CONTROLLER_HELLO, BINARY_REQUEST
+
+CSV_SEND_INTERVAL = 0.02
+BINARY_SEND_INTERVAL = 0.005
+CSV_REQUEST = b'C'
+
+def simulated_frame(t):
+    axes = [int(511.5 + 511.5 * math.sin(t * (0.7 + axis * 0.13) + axis)) for axis in range(6)]
+    buttons = [1 if (t * 0.5 + button * 0.25) % 1 < 0.1 else 0 for button in range(4)]
+    return axes + buttons
+
+def open_pty(link=None):
+    import tty
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    if link:
+        temp_link = link + ".tmp"
+        if os.path.lexists(temp_link):
+            os.remove(temp_link)
+        os.symlink(path, temp_link)
+        os.replace(temp_link, link)
+    os.set_blocking(master, False)
+    return master, slave, path
+
+def run(master, duration=None):
+    binary = False
+    seq = 0
+    start = time.perf_counter()
+    os.write(master, CONTROLLER_HELLO + b" 1\r\n")
+    while duration is None or time.perf_counter() - start < duration:
+        try:
+            requests = os.read(master, 64)
+        except BlockingIOError:
+            requests = b''
+        if BINARY_REQUEST in requests:
+            binary = True
+        elif CSV_REQUEST in requests:
+            binary = False
+
+        data = simulated_frame(time.perf_counter() - start)
+        if binary:
+            os.write(master, encode_binary_frame(seq, data))
+            seq = (seq + 1) & 0xFF
+            time.sleep(BINARY_SEND_INTERVAL)
+        else:
+            os.write(master, ",".join(str(value) for value in data).encode('ascii') + b"\r\n")
+            time.sleep(CSV_SEND_INTERVAL)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pretend to be the Arduino controller on a pseudo-terminal")
+    parser.add_argument("--link", help="keep a symlink to the pty at this path, e.g. /tmp/grabbing-controller")
+    parser.add_argument("--duration", type=float, help="unplug (exit) after this many seconds")
+    args = parser.parse_args()
+
+    if not hasattr(os, "openpty"):
+        sys.exit("controller_sim.py needs a POSIX pseudo-terminal")
+    master, slave, path = open_pty(args.link)
+    print(f"Simulated controller on {path}" + (f" (linked from {args.link})" if args.link else ""))
+    try:
+        run(master, args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,96 @@
+import time
+import collections
+import csv
+import json
+
+FRAME_TIMING_WINDOW = 600
+
+def summarize_ns(samples):
+    ordered = sorted(samples)
+    count = len(ordered)
+    def percentile(p):
+        return ordered[min(count - 1, int(count * p / 100))] / 1e6
+    return {
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": ordered[-1] / 1e6,
+        "mean": sum(ordered) / count / 1e6,
+    }
+
+class FrameTimer:
+    def __init__(self, window=FRAME_TIMING_WINDOW, enabled=True):
+        self.enabled = enabled
+        self.window = window
+        self.phases = []
+        self.samples = {}
+        self.frames = collections.deque(maxlen=window)
+        self.current = {}
+        self.frame_start = 0
+        self.last_mark = 0
+        self.frame_count = 0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter_ns()
+        self.current = {}
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.current[phase] = self.current.get(phase, 0) + now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.current["total"] = time.perf_counter_ns() - self.frame_start
+        for phase, elapsed in self.current.items():
+            history = self.samples.get(phase)
+            if history is None:
+                history = self.samples[phase] = collections.deque(maxlen=self.window)
+                self.phases.append(phase)
+            history.append(elapsed)
+        self.frames.append(self.current)
+        self.frame_count += 1
+
+    def get_stats(self):
+        return {phase: summarize_ns(self.samples[phase]) for phase in self.phases}
+
+    def dump(self, path):
+        try:
+            if path.endswith(".csv"):
+                with open(path, 'w', newline='', encoding='utf-8') as dump_file:
+                    writer = csv.writer(dump_file)
+                    writer.writerow(["frame"] + [f"{phase}_ms" for phase in self.phases])
+                    first_frame = self.frame_count - len(self.frames)
+                    for index, frame in enumerate(self.frames):
+                        writer.writerow([first_frame + index] +
+                                        [f"{frame.get(phase, 0) / 1e6:.4f}" for phase in self.phases])
+            else:
+                with open(path, 'w', encoding='utf-8') as dump_file:
+                    json.dump({"frames": self.frame_count, "window": self.window, "unit": "ms",
+                               "phases": self.get_stats()}, dump_file, indent=2)
+            print(f"Wrote frame timing to {path}")
+        except OSError as e:
+            print(f"Could not write frame timing: {e}")
+
+class StartupTimer:
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def report(self):
+        breakdown = ", ".join(f"{phase} {elapsed:.1f} ms" for phase, elapsed in self.phases)
+        print(f"Startup: {breakdown} (first frame {(self.last - self.start) * 1000:.1f} ms after launch)")
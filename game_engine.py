@@ -0,0 +1,641 @@
+import pygame as pg
+import random
+import math
+import collections
+from array import array
+from assets import assets
+
+WIDTH, HEIGHT = 1280, 720
+SIMULATION_RATE = 120
+SIMULATION_STEP_MS = 1000 / SIMULATION_RATE
+PLAYER_SPEED_REFERENCE_RATE = 60
+ITEM_SPAWN_INTERVAL = 2000
+PLAYER_MOVE_SPEED = 5
+PLAYER_ROTATE_SPEED = 5
+PLAYER_TICK_MOVE_SPEED = PLAYER_MOVE_SPEED * PLAYER_SPEED_REFERENCE_RATE / SIMULATION_RATE
+PLAYER_TICK_ROTATE_SPEED = PLAYER_ROTATE_SPEED * PLAYER_SPEED_REFERENCE_RATE / SIMULATION_RATE
+MATCH_TIME_SECONDS = 60
+COUNTDOWN_TIME = 4
+ROTATION_CACHE_STEP = 2
+ROTATION_CACHE_MAX_ENTRIES = 1024
+ITEM_GRID_CELL_SIZE = 64
+ITEM_SCALE = 1.5
+ITEM_SPAWN_X_RANGE = (WIDTH // 2 - 200 + 35, WIDTH // 2 + 200 - 35)
+ITEM_SPAWN_Y_RANGE = (HEIGHT // 2 - 200 + 35, HEIGHT // 2 + 200 - 35)
+DEFAULT_PLAYER_COUNT = 2
+MAX_PLAYER_COUNT = 8
+GRIPPER_OFFSET = 40
+# even player indexes play from the left of the pool, odd ones from the right
+TEAM_ASSETS = (
+    ("assets/player2.png", "assets/player2_griped.png", "assets/player2_basket.png"),
+    ("assets/player1.png", "assets/player1_griped.png", "assets/player1_basket.png"),
+)
+
+COLOR_DICT = {
+    "LightGray": (150, 150, 150),
+    "DarkGray": (36, 36, 36),
+    "Gray": (180, 180, 180),
+    "White": (255, 255, 255),
+    "Black": (0, 0, 0),
+    "Red": (150, 0, 0),
+    "Blue": (0, 0, 150),
+    "Green": (0, 255, 0),
+    "Orange": (255, 165, 0)
+}
+
+NO_INPUT = (0, 0, 0, False)
+
+def get_time_ms():
+    return pg.time.get_ticks()
+
+class TimerManager:
+    def __init__(self, time_source=get_time_ms):
+        self.timers = {}
+        self.time_source = time_source
+
+    def set_timer(self, timer_id, interval):
+        self.timers[timer_id] = self.time_source() + interval
+
+    def check_timer(self, timer_id):
+        if timer_id not in self.timers:
+            self.set_timer(timer_id, 0)
+            return False
+        
+        if self.time_source() >= self.timers[timer_id]:
+            self.set_timer(timer_id, 0)
+            return True
+        return False
+
+    def check_and_reset_timer(self, timer_id, interval):
+        if timer_id not in self.timers:
+            self.set_timer(timer_id, interval)
+            return False
+        
+        if self.time_source() >= self.timers[timer_id]:
+            self.set_timer(timer_id, interval)
+            return True
+        return False
+
+class RotationCache:
+    def __init__(self, step=ROTATION_CACHE_STEP, max_entries=ROTATION_CACHE_MAX_ENTRIES):
+        self.step = step
+        self.max_entries = max_entries
+        self.surfaces = collections.OrderedDict()
+
+    def quantize(self, angle):
+        return round(angle / self.step) * self.step % 360
+
+    def get(self, key, image, angle):
+        cache_key = (key, self.quantize(angle))
+        rotated = self.surfaces.get(cache_key)
+        if rotated is None:
+            rotated = pg.transform.rotate(image, -cache_key[1])
+            self.surfaces[cache_key] = rotated
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(cache_key)
+        return rotated
+
+    def warm(self, key, image):
+        angle = 0
+        while angle < 360:
+            self.get(key, image, angle)
+            angle += self.step
+
+    def clear(self):
+        self.surfaces.clear()
+
+rotation_cache = RotationCache()
+
+def create_item_image(scale=ITEM_SCALE):
+    size = int(20 * scale)
+    image = pg.Surface((size, size), pg.SRCALPHA)
+    pg.draw.circle(image, COLOR_DICT["Gray"], (size // 2, size // 2), size // 2)
+    return image
+
+class Item(pg.sprite.Sprite):
+    def __init__(self, x=-1, y=-1, scale=ITEM_SCALE):
+        super().__init__()
+        self.size = int(20 * scale)
+        self.image = create_item_image(scale)
+
+        if x == -1:
+            x = random.randint(*ITEM_SPAWN_X_RANGE)
+        if y == -1:
+            y = random.randint(*ITEM_SPAWN_Y_RANGE)
+        
+        self.rect = self.image.get_rect(center=(x, y))
+
+    def pick(self):
+        self.kill()
+
+def lerp_angle(start, end, alpha):
+    return (start + ((end - start + 180) % 360 - 180) * alpha) % 360
+
+class PlayerArrays:
+    COLUMNS = ("x", "y", "angle", "previous_x", "previous_y", "previous_angle", "gripper_x", "gripper_y",
+               "previous_gripper_x", "previous_gripper_y", "has_item", "shows_item", "grab_pressed")
+
+    def __init__(self, count):
+        self.count = count
+        zeros = [0.0] * count
+        self.x = array('d', zeros)
+        self.y = array('d', zeros)
+        self.angle = array('d', zeros)
+        self.previous_x = array('d', zeros)
+        self.previous_y = array('d', zeros)
+        self.previous_angle = array('d', zeros)
+        self.gripper_x = array('d', zeros)
+        self.gripper_y = array('d', zeros)
+        self.previous_gripper_x = array('d', zeros)
+        self.previous_gripper_y = array('d', zeros)
+        # has_item is the gripper's; the player's sprite picks it up one tick later through shows_item
+        self.has_item = array('B', bytes(count))
+        self.shows_item = array('B', bytes(count))
+        self.grab_pressed = array('B', bytes(count))
+
+    def save_previous_state(self):
+        self.previous_x[:] = self.x
+        self.previous_y[:] = self.y
+        self.previous_angle[:] = self.angle
+        self.previous_gripper_x[:] = self.gripper_x
+        self.previous_gripper_y[:] = self.gripper_y
+
+    def save_state(self):
+        return [getattr(self, name)[:] for name in self.COLUMNS]
+
+    def restore_state(self, state):
+        # sprites hold references to these arrays, so copy into them rather than replacing them
+        for name, column in zip(self.COLUMNS, state):
+            getattr(self, name)[:] = column
+
+class InterpolatedSprite(pg.sprite.Sprite):
+    def __init__(self, states, index, x_values, y_values, previous_x_values, previous_y_values):
+        super().__init__()
+        self.states = states
+        self.index = index
+        self.x_values = x_values
+        self.y_values = y_values
+        self.previous_x_values = previous_x_values
+        self.previous_y_values = previous_y_values
+
+    @property
+    def position(self):
+        return pg.math.Vector2(self.x_values[self.index], self.y_values[self.index])
+
+    @property
+    def angle(self):
+        return self.states.angle[self.index]
+
+    def save_state(self):
+        return self.image_key, self.image, self.rect.copy()
+
+    def restore_state(self, state):
+        self.image_key, self.image, rect = state
+        self.rect = rect.copy()
+
+    def get_draw_state(self, alpha):
+        index = self.index
+        x, y = self.x_values[index], self.y_values[index]
+        previous_x, previous_y = self.previous_x_values[index], self.previous_y_values[index]
+        angle, previous_angle = self.states.angle[index], self.states.previous_angle[index]
+        if alpha >= 1 or (previous_x == x and previous_y == y and previous_angle == angle):
+            return self.image, self.rect.copy()
+        image = self.get_rotated_image(lerp_angle(previous_angle, angle, alpha))
+        position = pg.math.Vector2(previous_x, previous_y).lerp((x, y), alpha)
+        return image, image.get_rect(center=position)
+
+class Gripper(InterpolatedSprite):
+    def __init__(self, player):
+        states = player.states
+        super().__init__(states, player.index, states.gripper_x, states.gripper_y,
+                         states.previous_gripper_x, states.previous_gripper_y)
+        self.original_image = pg.Surface((8, 20), pg.SRCALPHA)
+        pg.draw.rect(self.original_image, COLOR_DICT["Black"], (0, 0, 8, 20))
+        self.image = self.original_image
+        self.rect = self.image.get_rect(center=player.rect.center)
+        self.image_key = None
+        self.player_id = player.player_id
+        states.gripper_x[self.index], states.gripper_y[self.index] = self.rect.center
+        states.previous_gripper_x[self.index], states.previous_gripper_y[self.index] = self.rect.center
+
+    @property
+    def has_item(self):
+        return bool(self.states.has_item[self.index])
+
+    def get_rotated_image(self, angle):
+        return rotation_cache.get("gripper", self.original_image, angle)
+
+    def update(self, player):
+        states, index = self.states, self.index
+        states.shows_item[index] = states.has_item[index]
+        angle = states.angle[index]
+        rad = math.radians(angle)
+
+        x = states.gripper_x[index] = states.x[index] + math.cos(rad) * GRIPPER_OFFSET
+        y = states.gripper_y[index] = states.y[index] + math.sin(rad) * GRIPPER_OFFSET
+
+        image_key = rotation_cache.quantize(angle)
+        if image_key != self.image_key:
+            self.image_key = image_key
+            self.image = self.get_rotated_image(angle)
+            self.rect = self.image.get_rect(center=(x, y))
+        else:
+            self.rect.center = (x, y)
+
+    def handle_grip_action(self, item_list):
+        states, index = self.states, self.index
+        if states.grab_pressed[index]:
+            if not states.has_item[index]:
+                if item_list.pick_item(self.rect):
+                    states.has_item[index] = 1
+            else:
+                item_list.spawn_item(self.rect.centerx, self.rect.centery)
+                states.has_item[index] = 0
+            states.grab_pressed[index] = 0
+
+    def set_key_pressed(self):
+        self.states.grab_pressed[self.index] = 1
+
+class Player(InterpolatedSprite):
+    def __init__(self, states, index, x, y, angle, image_path, gripped_image_path, scale=1.0):
+        super().__init__(states, index, states.x, states.y, states.previous_x, states.previous_y)
+        self.base_image_path = image_path
+        self.gripped_image_path = gripped_image_path
+        self.scale = scale
+        
+        self.original_images = {
+            "normal": assets.get_scaled_by(self.base_image_path, self.scale),
+            "gripped": assets.get_scaled_by(self.gripped_image_path, self.scale)
+        }
+        self.image = self.original_images["normal"]
+        self.rect = self.image.get_rect(center=(x, y))
+
+        self.move_speed = PLAYER_TICK_MOVE_SPEED
+        self.rotate_speed = PLAYER_TICK_ROTATE_SPEED
+        self.player_id = index + 1
+
+        states.x[index] = states.previous_x[index] = x
+        states.y[index] = states.previous_y[index] = y
+        states.angle[index] = states.previous_angle[index] = angle
+        self.image_key = ("normal", rotation_cache.quantize(angle))
+        self.image = self._get_rotated_image("normal", angle)
+
+    @property
+    def has_item(self):
+        return bool(self.states.shows_item[self.index])
+
+    def _get_rotated_image(self, variant, angle):
+        path = self.gripped_image_path if variant == "gripped" else self.base_image_path
+        return rotation_cache.get((path, self.scale), self.original_images[variant], angle)
+
+    def get_rotated_image(self, angle):
+        return self._get_rotated_image(self.image_key[0], angle)
+
+    def warm_rotation_cache(self):
+        for variant, path in (("normal", self.base_image_path), ("gripped", self.gripped_image_path)):
+            rotation_cache.warm((path, self.scale), self.original_images[variant])
+
+    def update(self, move_forward_backward_speed, move_left_right_speed, rotate_speed_val):
+        states, index = self.states, self.index
+        angle = states.angle[index] = (states.angle[index] + rotate_speed_val) % 360
+
+        rad = math.radians(angle)
+
+        dx_forward = math.cos(rad) * move_forward_backward_speed
+        dy_forward = math.sin(rad) * move_forward_backward_speed
+
+        dx_strafe = math.cos(rad + math.pi / 2) * move_left_right_speed
+        dy_strafe = math.sin(rad + math.pi / 2) * move_left_right_speed
+
+        x = states.x[index] + (dx_forward + dx_strafe)
+        y = states.y[index] + (dy_forward + dy_strafe)
+
+        variant = "gripped" if states.shows_item[index] else "normal"
+        image_key = (variant, rotation_cache.quantize(angle))
+        if image_key != self.image_key:
+            self.image_key = image_key
+            self.image = self._get_rotated_image(variant, angle)
+            self.rect = self.image.get_rect()
+        
+        half_width = self.rect.width / 2
+        half_height = self.rect.height / 2
+        x = states.x[index] = max(half_width, min(x, WIDTH - half_width))
+        y = states.y[index] = max(half_height, min(y, HEIGHT - half_height))
+        self.rect.center = (x, y)
+
+class Pool(pg.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.image = assets.get("assets/pool.png", (400, 400))
+        self.rect = self.image.get_rect(center=(WIDTH / 2, HEIGHT / 2))
+
+class Basket(pg.sprite.Sprite):
+    def __init__(self, x, y, image_path, player_id):
+        super().__init__()
+        self.score = 0
+        self.width = 70
+        self.height = 100
+        self.image = assets.get(image_path, (self.width, self.height))
+        self.rect = self.image.get_rect(topleft=(x, y))
+        self.player_id = player_id
+
+    def update(self, item_list):
+        self.score += item_list.capture_items(self.rect)
+
+class TMinus:
+    def __init__(self, total_time_seconds=60):
+        self.total_time = total_time_seconds
+        self.time_left = total_time_seconds
+        self.is_playing = True
+
+    def update(self, delta_time_ms):
+        if self.is_playing:
+            self.time_left -= delta_time_ms / 1000
+            if self.time_left <= 0:
+                self.time_left = 0
+                self.is_playing = False
+
+class GameState:
+    MAIN_MENU = 0
+    COUNTDOWN = 1
+    PLAYING = 2
+    GAME_OVER = 3
+
+    def __init__(self):
+        self.state = self.MAIN_MENU
+        self.countdown_start_time = 0
+        self.current_countdown_value = COUNTDOWN_TIME
+
+    def set_state(self, new_state):
+        self.state = new_state
+        if new_state == self.COUNTDOWN:
+            self.countdown_start_time = get_time_ms()
+            self.current_countdown_value = COUNTDOWN_TIME
+
+    def get_state(self):
+        return self.state
+    
+    def update_countdown(self):
+        if self.state == self.COUNTDOWN:
+            elapsed_time = (get_time_ms() - self.countdown_start_time) / 1000
+            self.current_countdown_value = COUNTDOWN_TIME - math.ceil(elapsed_time)
+            if self.current_countdown_value <= 0:
+                self.set_state(self.PLAYING)
+
+class TrackedGroup(pg.sprite.Group):
+    def __init__(self, *sprites):
+        self.changed_rects = []
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.changed_rects.append(sprite.rect.copy())
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.changed_rects.append(sprite.rect.copy())
+
+    def pop_changed_rects(self):
+        rects = self.changed_rects
+        self.changed_rects = []
+        return rects
+
+class SpatialHashGroup(TrackedGroup):
+    def __init__(self, *sprites, cell_size=ITEM_GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.sprite_cells = {}
+        self.next_order = 0
+        super().__init__(*sprites)
+
+    def _cells_for_rect(self, rect):
+        size = self.cell_size
+        return [(cell_x, cell_y)
+                for cell_x in range(rect.left // size, (rect.right - 1) // size + 1)
+                for cell_y in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        cells = self._cells_for_rect(sprite.rect)
+        self.sprite_cells[sprite] = (self.next_order, cells)
+        self.next_order += 1
+        for cell in cells:
+            self.cells.setdefault(cell, {})[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        _order, cells = self.sprite_cells.pop(sprite)
+        for cell in cells:
+            bucket = self.cells[cell]
+            del bucket[sprite]
+            if not bucket:
+                del self.cells[cell]
+
+    def query_rects(self, rects):
+        found = {}
+        for rect in rects:
+            for cell in self._cells_for_rect(rect):
+                bucket = self.cells.get(cell)
+                if not bucket:
+                    continue
+                for sprite in bucket:
+                    if sprite not in found and rect.colliderect(sprite.rect):
+                        found[sprite] = self.sprite_cells[sprite][0]
+        return sorted(found, key=found.get)
+
+    def query_rect(self, rect):
+        return self.query_rects((rect,))
+
+    def spawn_item(self, x=-1, y=-1):
+        self.add(Item(x, y))
+
+    def pick_item(self, rect):
+        collided_items = self.query_rect(rect)
+        if not collided_items:
+            return False
+        collided_items[0].pick()
+        return True
+
+    def capture_items(self, rect):
+        collided_items = self.query_rect(rect)
+        for item in collided_items:
+            item.kill()
+        return len(collided_items)
+
+    def draw_rects(self, surface, rects):
+        for item in self.query_rects(rects):
+            surface.blit(item.image, item.rect)
+
+    def item_centers(self):
+        return [item.rect.center for item in self]
+
+    def save_state(self):
+        return self.sprite_cells.copy(), self.next_order
+
+    def restore_state(self, state):
+        sprite_cells, next_order = state
+        for sprite in [sprite for sprite in self.sprite_cells if sprite not in sprite_cells]:
+            self.remove(sprite)
+        for sprite, entry in sprite_cells.items():
+            if sprite not in self.sprite_cells:
+                self.add(sprite)
+                self.sprite_cells[sprite] = entry
+        self.next_order = next_order
+
+def player_layout(player_count):
+    pool_center_x = WIDTH // 2
+    pool_radius = 200
+    distance_from_pool_edge = 100
+    basket_width = 70
+    basket_margin = 50
+
+    side_counts = ((player_count + 1) // 2, player_count // 2)
+    layout = []
+    for index in range(player_count):
+        side = index % 2
+        y = HEIGHT * (index // 2 + 1) / (side_counts[side] + 1)
+        if side == 0:
+            player_x = pool_center_x - pool_radius - distance_from_pool_edge
+            basket_x = basket_margin
+            angle = 0
+        else:
+            player_x = pool_center_x + pool_radius + distance_from_pool_edge
+            basket_x = WIDTH - basket_margin - basket_width
+            angle = 180
+        layout.append((player_x, y, angle, basket_x, y - 50, TEAM_ASSETS[side]))
+    return layout
+
+class Match:
+    def __init__(self, match_time_seconds=MATCH_TIME_SECONDS, item_list=None, seed=None,
+                 player_count=DEFAULT_PLAYER_COUNT, item_spawn_interval=ITEM_SPAWN_INTERVAL,
+                 item_spawn_area=(ITEM_SPAWN_X_RANGE, ITEM_SPAWN_Y_RANGE),
+                 player_move_speed=PLAYER_TICK_MOVE_SPEED, player_rotate_speed=PLAYER_TICK_ROTATE_SPEED):
+        if not 1 <= player_count <= MAX_PLAYER_COUNT:
+            raise ValueError(f"player_count must be between 1 and {MAX_PLAYER_COUNT}")
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.match_time_seconds = match_time_seconds
+        self.player_count = player_count
+        self.item_spawn_interval = item_spawn_interval
+        self.item_spawn_x_range, self.item_spawn_y_range = item_spawn_area
+        self.background_sprites = pg.sprite.Group()
+        self.item_list = item_list if item_list is not None else SpatialHashGroup()
+        self.player_sprites = pg.sprite.Group()
+        self.pool = Pool()
+        self.background_sprites.add(self.pool)
+
+        self.states = PlayerArrays(player_count)
+        self.players = []
+        self.grippers = []
+        self.baskets = []
+        for index, (player_x, player_y, angle, basket_x, basket_y, team_assets) in enumerate(player_layout(player_count)):
+            image_path, gripped_image_path, basket_image_path = team_assets
+            player = Player(self.states, index, player_x, player_y, angle, image_path, gripped_image_path, 1.5)
+            player.move_speed = player_move_speed
+            player.rotate_speed = player_rotate_speed
+            gripper = Gripper(player)
+            basket = Basket(basket_x, basket_y, basket_image_path, index + 1)
+            self.players.append(player)
+            self.grippers.append(gripper)
+            self.baskets.append(basket)
+            self.background_sprites.add(basket)
+            self.player_sprites.add(player, gripper)
+
+        self.play_time = TMinus(total_time_seconds=match_time_seconds)
+        self.time_ms = 0
+        self.tick_count = 0
+        self.timer_manager = TimerManager(self.get_time_ms)
+
+    def get_time_ms(self):
+        return self.time_ms
+
+    def warm_rotation_cache(self):
+        for player in self.players:
+            player.warm_rotation_cache()
+        rotation_cache.warm("gripper", self.grippers[0].original_image)
+
+    def is_over(self):
+        return not self.play_time.is_playing
+
+    def get_scores(self):
+        return tuple(basket.score for basket in self.baskets)
+
+    def step(self, *controls):
+        self.time_ms += SIMULATION_STEP_MS
+        self.tick_count += 1
+        self.play_time.update(SIMULATION_STEP_MS)
+        if not self.play_time.is_playing:
+            return False
+
+        if len(controls) < self.player_count:
+            controls += (NO_INPUT,) * (self.player_count - len(controls))
+
+        self.states.save_previous_state()
+
+        for gripper, player_controls in zip(self.grippers, controls):
+            if player_controls[3]:
+                gripper.set_key_pressed()
+
+        for player, player_controls in zip(self.players, controls):
+            player.update(*player_controls[:3])
+
+        for gripper, player in zip(self.grippers, self.players):
+            gripper.update(player)
+
+        for gripper in self.grippers:
+            gripper.handle_grip_action(self.item_list)
+
+        for basket in self.baskets:
+            basket.update(self.item_list)
+
+        if self.timer_manager.check_and_reset_timer("item_spawn", self.item_spawn_interval):
+            self.item_list.spawn_item(self.rng.randint(*self.item_spawn_x_range),
+                                      self.rng.randint(*self.item_spawn_y_range))
+        return True
+
+    def save_state(self):
+        return (self.tick_count, self.time_ms, self.play_time.time_left, self.play_time.is_playing,
+                dict(self.timer_manager.timers), self.rng.getstate(), self.states.save_state(),
+                [player.save_state() for player in self.players], [gripper.save_state() for gripper in self.grippers],
+                [basket.score for basket in self.baskets], self.item_list.save_state())
+
+    def restore_state(self, state):
+        (self.tick_count, self.time_ms, self.play_time.time_left, self.play_time.is_playing, timers, rng_state,
+         player_states, players, grippers, scores, items) = state
+        self.timer_manager.timers = dict(timers)
+        self.rng.setstate(rng_state)
+        self.states.restore_state(player_states)
+        for player, player_state in zip(self.players, players):
+            player.restore_state(player_state)
+        for gripper, gripper_state in zip(self.grippers, grippers):
+            gripper.restore_state(gripper_state)
+        for basket, score in zip(self.baskets, scores):
+            basket.score = score
+        self.item_list.restore_state(items)
+
+    def run(self, input_callback, max_ticks=None):
+        while max_ticks is None or self.tick_count < max_ticks:
+            if not self.step(*input_callback(self)):
+                break
+        return self.get_scores()
+
+def random_input_callback(match):
+    controls = []
+    for player in match.players:
+        controls.append((random.choice((-player.move_speed, 0, player.move_speed)),
+                         random.choice((-player.move_speed, 0, player.move_speed)),
+                         random.choice((-player.rotate_speed, 0, player.rotate_speed)),
+                         random.random() < 0.02))
+    return controls
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    match = Match()
+    scores = match.run(random_input_callback)
+    elapsed = time.perf_counter() - start
+    print(f"Scores: {scores}, ticks: {match.tick_count}, "
+          f"{match.tick_count / elapsed:.0f} ticks/s ({elapsed:.2f}s)")
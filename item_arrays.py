@@ -0,0 +1,163 @@
+import random
+import pygame as pg
+from game_engine import ITEM_SCALE, ITEM_SPAWN_X_RANGE, ITEM_SPAWN_Y_RANGE, create_item_image
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ITEM_ARRAY_INITIAL_CAPACITY = 256
+ITEM_COLORKEY = (255, 0, 255)
+
+def create_colorkey_image(image):
+    keyed = pg.Surface(image.get_size())
+    keyed.fill(ITEM_COLORKEY)
+    keyed.blit(image, (0, 0))
+    keyed.set_colorkey(ITEM_COLORKEY, pg.RLEACCEL)
+    if pg.display.get_init() and pg.display.get_surface() is not None:
+        return keyed.convert()
+    return keyed
+
+class ItemArrayStore:
+    def __init__(self, capacity=ITEM_ARRAY_INITIAL_CAPACITY, scale=ITEM_SCALE):
+        if np is None:
+            raise RuntimeError("ItemArrayStore requires numpy (pip install numpy)")
+        self.image = create_colorkey_image(create_item_image(scale))
+        self.size = self.image.get_width()
+        self.left = np.zeros(capacity, dtype=np.int32)
+        self.top = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.count = 0
+        self.live_count = 0
+        self.changed_rects = []
+
+    def __len__(self):
+        return self.live_count
+
+    def _item_rect(self, index):
+        return pg.Rect(int(self.left[index]), int(self.top[index]), self.size, self.size)
+
+    def _make_room(self, needed=1):
+        capacity = len(self.alive)
+        if self.count + needed <= capacity:
+            return
+        self.compact()
+        if self.count + needed <= capacity // 2:
+            return
+        new_capacity = max(capacity * 2, (self.count + needed) * 2)
+        for name in ("left", "top", "alive"):
+            array = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+
+    def compact(self):
+        keep = np.flatnonzero(self.alive[:self.count])
+        live = len(keep)
+        self.left[:live] = self.left[keep]
+        self.top[:live] = self.top[keep]
+        self.alive[:live] = True
+        self.alive[live:] = False
+        self.count = live
+
+    def spawn_item(self, x=-1, y=-1):
+        if x == -1:
+            x = random.randint(*ITEM_SPAWN_X_RANGE)
+        if y == -1:
+            y = random.randint(*ITEM_SPAWN_Y_RANGE)
+        self._make_room()
+        rect = self.image.get_rect(center=(x, y))
+        index = self.count
+        self.left[index] = rect.left
+        self.top[index] = rect.top
+        self.alive[index] = True
+        self.count += 1
+        self.live_count += 1
+        self.changed_rects.append(rect)
+
+    def spawn_items(self, positions):
+        positions = np.asarray(positions, dtype=np.int32).reshape(-1, 2)
+        self._make_room(len(positions))
+        start = self.count
+        end = start + len(positions)
+        self.left[start:end] = positions[:, 0] - self.size // 2
+        self.top[start:end] = positions[:, 1] - self.size // 2
+        self.alive[start:end] = True
+        self.count = end
+        self.live_count += len(positions)
+        self.changed_rects.extend(self._item_rect(index) for index in range(start, end))
+
+    def _overlap_mask(self, rect):
+        count = self.count
+        left = self.left[:count]
+        top = self.top[:count]
+        return (self.alive[:count]
+                & (left < rect.right) & (left + self.size > rect.left)
+                & (top < rect.bottom) & (top + self.size > rect.top))
+
+    def _remove(self, indices):
+        self.alive[indices] = False
+        self.live_count -= len(indices)
+        for index in indices:
+            self.changed_rects.append(self._item_rect(index))
+
+    def pick_item(self, rect):
+        if rect.width <= 0 or rect.height <= 0 or not self.live_count:
+            return False
+        mask = self._overlap_mask(rect)
+        index = int(mask.argmax())
+        if not mask[index]:
+            return False
+        self._remove([index])
+        return True
+
+    def capture_items(self, rect):
+        if rect.width <= 0 or rect.height <= 0 or not self.live_count:
+            return 0
+        indices = np.flatnonzero(self._overlap_mask(rect))
+        self._remove(indices)
+        return len(indices)
+
+    def pop_changed_rects(self):
+        rects = self.changed_rects
+        self.changed_rects = []
+        return rects
+
+    def _blit_indices(self, surface, indices):
+        image = self.image
+        surface.blits([(image, (int(x), int(y))) for x, y in zip(self.left[indices], self.top[indices])], False)
+
+    def draw(self, surface):
+        self._blit_indices(surface, np.flatnonzero(self.alive[:self.count]))
+
+    def draw_rects(self, surface, rects):
+        if not rects or not self.live_count:
+            return
+        mask = np.zeros(self.count, dtype=bool)
+        for rect in rects:
+            if rect.width > 0 and rect.height > 0:
+                mask |= self._overlap_mask(rect)
+        self._blit_indices(surface, np.flatnonzero(mask))
+
+    def save_state(self):
+        count = self.count
+        return self.left[:count].copy(), self.top[:count].copy(), self.alive[:count].copy(), self.live_count
+
+    def restore_state(self, state):
+        left, top, alive, live_count = state
+        self.changed_rects.extend(self._item_rect(index) for index in np.flatnonzero(self.alive[:self.count]))
+        self.count = 0
+        self._make_room(len(alive))
+        count = self.count = len(alive)
+        self.left[:count] = left
+        self.top[:count] = top
+        self.alive[:count] = alive
+        self.alive[count:] = False
+        self.live_count = live_count
+        self.changed_rects.extend(self._item_rect(index) for index in np.flatnonzero(alive))
+
+    def item_centers(self):
+        indices = np.flatnonzero(self.alive[:self.count])
+        half = self.size // 2
+        return list(zip((self.left[indices] + half).tolist(), (self.top[indices] + half).tolist()))
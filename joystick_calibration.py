@@ -0,0 +1,160 @@
+import os
+import json
+import collections
+import threading
+import queue
+from serial_input import axis_field_count
+
+CALIBRATION_PROFILE_FILE = "joystick_calibration.json"
+AXIS_RESOLUTION = 1024
+DEFAULT_CENTRE = 511.5
+DEFAULT_DEAD_ZONE = 50
+DEFAULT_HALF_RANGE = 400
+MIN_DEAD_ZONE = 12
+MAX_DEAD_ZONE = 120
+DEAD_ZONE_MARGIN = 8
+RESPONSE_EXPONENT = 1.5
+# samples of a stick left alone at the menu; a wider spread means someone is moving it,
+# a centre far from the middle means someone is holding it over
+REST_WINDOW = 60
+REST_SPREAD_LIMIT = 40
+REST_CENTRE_TOLERANCE = 120
+
+def default_axis():
+    return {
+        "centre": DEFAULT_CENTRE,
+        "low": DEFAULT_CENTRE - DEFAULT_HALF_RANGE,
+        "high": DEFAULT_CENTRE + DEFAULT_HALF_RANGE,
+        "dead_zone": DEFAULT_DEAD_ZONE,
+    }
+
+def compile_axis_table(axis, max_speed, exponent=RESPONSE_EXPONENT):
+    centre, dead_zone = axis["centre"], axis["dead_zone"]
+    positive_span = max(1.0, axis["high"] - centre - dead_zone)
+    negative_span = max(1.0, centre - axis["low"] - dead_zone)
+    table = []
+    for value in range(AXIS_RESOLUTION):
+        offset = value - centre
+        if abs(offset) <= dead_zone:
+            table.append(0.0)
+        elif offset > 0:
+            table.append(max_speed * min(1.0, (offset - dead_zone) / positive_span) ** exponent)
+        else:
+            table.append(-max_speed * min(1.0, (-offset - dead_zone) / negative_span) ** exponent)
+    return table
+
+class JoystickCalibration:
+    def __init__(self, axis_speeds, path=CALIBRATION_PROFILE_FILE):
+        self.axis_speeds = axis_speeds
+        self.path = path
+        self.profiles = {}
+        self.device_id = None
+        self.axes = [default_axis() for _ in axis_speeds]
+        self.axis_count = len(axis_speeds)
+        self.tables = [None] * len(axis_speeds)
+        self.rest_samples = [collections.deque(maxlen=REST_WINDOW) for _ in axis_speeds]
+        self.changed = False
+        # table rebuilds and profile writes run in order on a worker thread, off the frame loop
+        self.jobs = queue.Queue()
+        self.worker = None
+        self.load()
+        self.tables = self.compile_tables(self.axes, self.axis_count)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as profile_file:
+                self.profiles = json.load(profile_file).get("devices", {})
+        except (OSError, ValueError) as e:
+            print(f"Could not load joystick calibration {self.path}: {e}")
+            self.profiles = {}
+
+    def save(self):
+        if not self.changed or self.device_id is None:
+            return
+        self.profiles[self.device_id] = {"axes": [dict(axis) for axis in self.axes]}
+        self.changed = False
+        self._submit(self.device_id, dict(self.profiles))
+
+    def _write_profiles(self, device_id, profiles):
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as profile_file:
+                json.dump({"devices": profiles}, profile_file, indent=2)
+            os.replace(temp_path, self.path)
+            print(f"Saved joystick calibration for {device_id}")
+        except OSError as e:
+            print(f"Could not save joystick calibration: {e}")
+
+    def select_device(self, device_id, field_count):
+        self.device_id = device_id
+        self.axis_count = min(axis_field_count(field_count), len(self.axis_speeds))
+        saved_axes = (self.profiles.get(device_id) or {}).get("axes", [])[:len(self.axis_speeds)]
+        self.axes = [dict(default_axis(), **axis) for axis in saved_axes]
+        self.axes += [default_axis() for _ in range(len(self.axis_speeds) - len(self.axes))]
+        if saved_axes:
+            print(f"Using joystick calibration for {device_id}")
+        for samples in self.rest_samples:
+            samples.clear()
+        self.changed = False
+        self.compile()
+
+    def compile_tables(self, axes, axis_count):
+        # axes the layout does not use keep whatever table they had
+        tables = list(self.tables)
+        for index in range(axis_count):
+            tables[index] = compile_axis_table(axes[index], self.axis_speeds[index])
+        return tables
+
+    def compile(self):
+        # the current tables stay in use until the worker swaps in the new ones
+        self._submit(None, None)
+
+    def _submit(self, device_id, profiles):
+        self.jobs.put(([dict(axis) for axis in self.axes], self.axis_count, device_id, profiles))
+        if not self.worker:
+            self.worker = threading.Thread(target=self._run_jobs, daemon=True)
+            self.worker.start()
+
+    def _run_jobs(self):
+        while True:
+            axes, axis_count, device_id, profiles = self.jobs.get()
+            if profiles is None:
+                self.tables = self.compile_tables(axes, axis_count)
+            else:
+                self._write_profiles(device_id, profiles)
+
+    def observe(self, data):
+        for index in range(min(axis_field_count(len(data)), len(self.axes))):
+            value = data[index]
+            axis = self.axes[index]
+            if value < axis["low"]:
+                axis["low"] = value
+                self.changed = True
+            elif value > axis["high"]:
+                axis["high"] = value
+                self.changed = True
+
+            samples = self.rest_samples[index]
+            samples.append(value)
+            if len(samples) < REST_WINDOW:
+                continue
+            spread = max(samples) - min(samples)
+            if spread > REST_SPREAD_LIMIT:
+                continue
+            centre = sorted(samples)[REST_WINDOW // 2]
+            if abs(centre - DEFAULT_CENTRE) > REST_CENTRE_TOLERANCE:
+                samples.clear()
+                continue
+            dead_zone = min(MAX_DEAD_ZONE, max(MIN_DEAD_ZONE, spread / 2 + DEAD_ZONE_MARGIN))
+            if centre != axis["centre"] or dead_zone != axis["dead_zone"]:
+                axis["centre"] = centre
+                axis["dead_zone"] = dead_zone
+                self.changed = True
+            samples.clear()
+
+    def finish(self):
+        if self.changed:
+            self.compile()
+            self.save()
@@ -1,407 +1,204 @@
-import pygame as pg
 import time
-import random
-import math
-import os
-import socket
-import json
-import threading
-import serial
-from serial.tools import list_ports
+STARTUP_BEGIN = time.perf_counter()
 
-pg.init()
+import pygame as pg
+import collections
+import threading
+from serial_discovery import ControllerConnection
+from serial_input import controller_player_fields
+from score_server import ScorePublisher
+from spectator_stream import SpectatorServer, SPECTATOR_PORT
+from score_store import ScoreStore
+from match_recording import MatchRecorder, MatchReplay, new_recording_path
+from netplay import NetplayTransport, RollbackSession, NETPLAY_PORT, parse_address
+from frame_timing import FrameTimer, StartupTimer
+from joystick_calibration import JoystickCalibration
+from assets import assets
+from game_engine import (WIDTH, HEIGHT, SIMULATION_STEP_MS, PLAYER_TICK_MOVE_SPEED, PLAYER_TICK_ROTATE_SPEED,
+                         COLOR_DICT, MAX_PLAYER_COUNT, TEAM_ASSETS, get_time_ms, TimerManager, GameState, Match)
+
+startup_timer = StartupTimer(STARTUP_BEGIN)
+startup_timer.mark("imports")
+
+pg.display.init()
+pg.font.init()
+pg.time.wait(0)
+startup_timer.mark("pygame init")
 
-WIDTH, HEIGHT = 1280, 720
 FPS = 60
-ITEM_SPAWN_INTERVAL = 2000
+MAX_SIMULATION_STEPS_PER_FRAME = 12
 GAME_OVER_RESET_DELAY = 5000
-PLAYER_MOVE_SPEED = 5
-PLAYER_ROTATE_SPEED = 5
-COUNTDOWN_TIME = 4
-
-COLOR_DICT = {
-    "LightGray": (150, 150, 150),
-    "DarkGray": (36, 36, 36),
-    "Gray": (180, 180, 180),
-    "White": (255, 255, 255),
-    "Black": (0, 0, 0),
-    "Red": (150, 0, 0),
-    "Blue": (0, 0, 150),
-    "Green": (0, 255, 0),
-    "Orange": (255, 165, 0)
-}
+ROTATION_CACHE_WARM = False
+TEXT_CACHE_MAX_ENTRIES = 256
+DIRTY_RECT_RENDERING = True
+ITEM_STORE = "sprites"
+PLAYER_COUNT = 2
+RECORD_MATCHES = False
+REPLAY_FILE = None
+# "host:port" of the other kiosk for networked play; each kiosk then owns one player and its local controls
+NETPLAY_PEER = None
+NETPLAY_LOCAL_PLAYER = 0
+FRAME_TIMING = True
+FRAME_TIMING_OVERLAY_KEY = pg.K_F3
+FRAME_TIMING_OVERLAY_REFRESH = 30
+FRAME_TIMING_DUMP = None
+JOYSTICK_CALIBRATION_FILE = "joystick_calibration.json"
+# forward, backward, left, right, rotate left, rotate right, grab, ready
+KEYBOARD_CONTROLS = (
+    (pg.K_w, pg.K_s, pg.K_a, pg.K_d, pg.K_q, pg.K_e, pg.K_f, pg.K_LSHIFT),
+    (pg.K_UP, pg.K_DOWN, pg.K_LEFT, pg.K_RIGHT, pg.K_KP4, pg.K_KP6, pg.K_m, pg.K_RSHIFT),
+)
+TEAM_NAMES = ("Blue", "Red")
+TEAM_COLORS = ("Blue", "Red")
+MENU_BUTTON_COMPACT_WIDTH = 240
 
 screen = pg.display.set_mode((WIDTH, HEIGHT), pg.FULLSCREEN)
 pg.display.set_caption("Grabbing Game")
 clock = pg.time.Clock()
+startup_timer.mark("window")
 
 font_large = pg.font.Font(None, 100)
 font_medium = pg.font.Font(None, 50)
 font_small = pg.font.Font(None, 36)
 font_countdown = pg.font.Font(None, 200)
+font_overlay = pg.font.Font(None, 24)
+startup_timer.mark("fonts")
 
 GAME_SERVER_IP = '0.0.0.0'
 GAME_SERVER_PORT = 12345
+SCORE_STORE_FILE = 'scores.db'
 
-scoreboard_client_socket = None
-scoreboard_client_address = None
-server_running = False
-
-def start_game_server():
-    global scoreboard_client_socket, scoreboard_client_address, server_running
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    try:
-        server_socket.bind((GAME_SERVER_IP, GAME_SERVER_PORT))
-        server_socket.listen(1)
-        server_socket.settimeout(0.5)
-        print(f"Game server listening on {GAME_SERVER_IP}:{GAME_SERVER_PORT}")
-        server_running = True
-    except socket.error as e:
-        print(f"Failed to start game server: {e}")
-        server_running = False
-        return
-
-    while server_running:
-        try:
-            conn, addr = server_socket.accept()
-            print(f"Scoreboard connected from {addr}")
-            scoreboard_client_socket = conn
-            scoreboard_client_address = addr
-        except socket.timeout:
-            pass
-        except socket.error as e:
-            print(f"Server accept error: {e}")
-            break
-    server_socket.close()
-    print("Game server stopped.")
+score_publisher = ScorePublisher(GAME_SERVER_IP, GAME_SERVER_PORT)
+score_store = ScoreStore(score_publisher, SCORE_STORE_FILE)
+score_publisher.replay_source = score_store
+spectator_server = SpectatorServer(GAME_SERVER_IP, SPECTATOR_PORT)
 
 def send_scores_to_scoreboard(score_data):
-    global scoreboard_client_socket
-    if scoreboard_client_socket:
-        try:
-            scoreboard_client_socket.sendall(json.dumps(score_data).encode('utf-8') + b'\n')
-            print(f"Sent scores to scoreboard: {score_data}")
-        except socket.error as e:
-            print(f"Error sending data to scoreboard: {e}. Closing connection.")
-            scoreboard_client_socket.close()
-            scoreboard_client_socket = None
-
-server_thread = threading.Thread(target=start_game_server, daemon=True)
-server_thread.start()
-
-ARDUINO_SERIAL_PORT = 'COM3'
+    score_store.record(score_data)
+    print(f"Queued scores for {score_publisher.get_subscriber_count()} scoreboard(s): {score_data}")
+
+ARDUINO_SERIAL_PORT = None
 ARDUINO_BAUD_RATE = 115200
+ARDUINO_USE_BINARY_PROTOCOL = True
 
-ser = None
+controller = ControllerConnection(ARDUINO_SERIAL_PORT, ARDUINO_BAUD_RATE, ARDUINO_USE_BINARY_PROTOCOL)
 
-def setup_serial():
-    global ser
-    print("Searching for Arduino COM ports...")
-    ports = list_ports.comports()
-    if not ports:
-        print("No COM ports found. Please ensure Arduino is connected.")
-    else:
-        print("Available COM ports:")
-        for p in ports:
-            print(f"- {p.device} ({p.description})")
-
-    try:
-        ser = serial.Serial(ARDUINO_SERIAL_PORT, ARDUINO_BAUD_RATE, timeout=0.1)
-        print(f"Connected to Arduino on {ARDUINO_SERIAL_PORT}")
-    except serial.SerialException as e:
-        print(f"Could not open serial port {ARDUINO_SERIAL_PORT}: {e}")
-        print("Please check if Arduino is connected and the port is correct. Game will proceed without Arduino control.")
-        ser = None
+def start_background_services():
+    score_store.start()
+    score_publisher.start()
+    spectator_server.start()
+    controller.start()
+    print(f"Background services ready {startup_timer.elapsed_ms():.0f} ms after launch")
 
 def read_arduino_data():
-    if ser and ser.isOpen():
-        try:
-            line = ser.readline().decode('utf-8').strip()
-            if line:
-                data = [int(x) for x in line.split(',')]
-                if len(data) == 10:
-                    return data
-                else:
-                    return None
-        except ValueError as ve:
-            return None
-        except Exception as e:
-            return None
+    reader = controller.reader
+    if reader:
+        return reader.get_latest_frame()
     return None
 
-def get_time_ms():
-    return pg.time.get_ticks()
-
-class TimerManager:
-    def __init__(self):
-        self.timers = {}
-
-    def set_timer(self, timer_id, interval):
-        self.timers[timer_id] = get_time_ms() + interval
-
-    def check_timer(self, timer_id):
-        if timer_id not in self.timers:
-            self.set_timer(timer_id, 0)
-            return False
-        
-        if get_time_ms() >= self.timers[timer_id]:
-            self.set_timer(timer_id, 0)
-            return True
-        return False
-
-    def check_and_reset_timer(self, timer_id, interval):
-        if timer_id not in self.timers:
-            self.set_timer(timer_id, interval)
-            return False
-        
-        if get_time_ms() >= self.timers[timer_id]:
-            self.set_timer(timer_id, interval)
-            return True
-        return False
+def read_arduino_button_presses():
+    reader = controller.reader
+    if reader:
+        return reader.pop_edge_events()
+    return []
 
 timer_manager = TimerManager()
 
-class Item(pg.sprite.Sprite):
-    def __init__(self, x=-1, y=-1, scale=1.5):
-        super().__init__()
-        self.size = int(20 * scale)
-        self.image = pg.Surface((self.size, self.size), pg.SRCALPHA)
-        pg.draw.circle(self.image, COLOR_DICT["Gray"], (self.size // 2, self.size // 2), self.size // 2)
-        
-        pool_x_min = WIDTH // 2 - 200 + 35
-        pool_x_max = WIDTH // 2 + 200 - 35
-        pool_y_min = HEIGHT // 2 - 200 + 35
-        pool_y_max = HEIGHT // 2 + 200 - 35
-
-        if x == -1:
-            x = random.randint(pool_x_min, pool_x_max)
-        if y == -1:
-            y = random.randint(pool_y_min, pool_y_max)
-        
-        self.rect = self.image.get_rect(center=(x, y))
-
-    def pick(self):
-        self.kill()
-
-class Gripper(pg.sprite.Sprite):
-    def __init__(self, player, player_id):
-        super().__init__()
-        self.original_image = pg.Surface((8, 20), pg.SRCALPHA)
-        pg.draw.rect(self.original_image, COLOR_DICT["Black"], (0, 0, 8, 20))
-        self.image = self.original_image
-        self.rect = self.image.get_rect(center=player.rect.center)
-        self.player_id = player_id
-        self.has_item = False
-        self.is_key_pressed = False
-
-    def update(self, player):
-        player.has_item = self.has_item
-        self.angle = player.angle
-        rad = math.radians(self.angle)
-
-        offset = 40
-        nose_x = player.rect.centerx + math.cos(rad) * offset
-        nose_y = player.rect.centery + math.sin(rad) * offset
-        new_center = (nose_x, nose_y)
-
-        self.image = pg.transform.rotate(self.original_image, -self.angle)
-        self.rect = self.image.get_rect(center=new_center)
-
-    def handle_grip_action(self, item_list):
-        if self.is_key_pressed:
-            if not self.has_item:
-                collided_items = pg.sprite.spritecollide(self, item_list, False)
-                if collided_items:
-                    item = collided_items[0]
-                    item.pick()
-                    self.has_item = True
-            else:
-                item_list.add(Item(self.rect.centerx, self.rect.centery))
-                self.has_item = False
-            self.is_key_pressed = False
-
-    def set_key_pressed(self):
-        self.is_key_pressed = True
-
-def map_joystick_to_speed(joystick_value, max_speed):
-    dead_zone = 50
-    
-    normalized_value = joystick_value - 511.5 
-
-    abs_value = abs(normalized_value)
-
-    if abs_value < dead_zone:
-        return 0
-
-    threshold_low = 150
-    threshold_mid = 300
-
-    speed_level_1 = max_speed * 0.3
-    speed_level_2 = max_speed * 0.6
-    speed_level_3 = max_speed * 1.0
-    
-    if abs_value < threshold_low:
-        speed = speed_level_1
-    elif abs_value < threshold_mid:
-        speed = speed_level_2
-    else:
-        speed = speed_level_3
-    
-    return speed if normalized_value > 0 else -speed
-
-class Player(pg.sprite.Sprite):
-    def __init__(self, x, y, image_path, gripped_image_path, player_id, scale=1.0):
-        super().__init__()
-        self.base_image_path = image_path
-        self.gripped_image_path = gripped_image_path
-        self.scale = scale
-        
-        self.original_images = {
-            "normal": self._load_and_scale_image(self.base_image_path),
-            "gripped": self._load_and_scale_image(self.gripped_image_path)
-        }
-        self.image = self.original_images["normal"]
-        self.rect = self.image.get_rect(center=(x, y))
-        
-        self.angle = 0
-        if player_id == 1:
-            self.angle = 0
-        elif player_id == 2:
-            self.angle = 180
-
-        self.move_speed = PLAYER_MOVE_SPEED
-        self.rotate_speed = PLAYER_ROTATE_SPEED
-        self.player_id = player_id
-        self.has_item = False
-        
-        self.image = pg.transform.rotate(self.image, -self.angle)
-        
-    def _load_and_scale_image(self, path):
-        original = pg.image.load(path).convert_alpha()
-        width = int(original.get_width() * self.scale)
-        height = int(original.get_height() * self.scale)
-        return pg.transform.scale(original, (width, height))
-
-    def update(self, move_forward_backward_speed, move_left_right_speed, rotate_speed_val):
-        self.image = self.original_images["gripped"] if self.has_item else self.original_images["normal"]
-        
-        self.angle += rotate_speed_val 
-        self.angle %= 360
-
-        rad = math.radians(self.angle)
-
-        dx_forward = math.cos(rad) * move_forward_backward_speed
-        dy_forward = math.sin(rad) * move_forward_backward_speed
-
-        dx_strafe = math.cos(rad + math.pi / 2) * move_left_right_speed
-        dy_strafe = math.sin(rad + math.pi / 2) * move_left_right_speed
-
-        self.rect.x += dx_forward + dx_strafe
-        self.rect.y += dy_forward + dy_strafe
-
-        old_center = self.rect.center
-        self.image = pg.transform.rotate(self.image, -self.angle)
-        self.rect = self.image.get_rect(center=old_center)
-        
-        self.rect.x = max(0, min(self.rect.x, WIDTH - self.rect.width))
-        self.rect.y = max(0, min(self.rect.y, HEIGHT - self.rect.height))
-        
-class Pool(pg.sprite.Sprite):
-    def __init__(self):
-        super().__init__()
-        original_image = pg.image.load("assets/pool.png").convert_alpha()
-        self.image = pg.transform.scale(original_image, (400, 400))
-        self.rect = self.image.get_rect(center=(WIDTH / 2, HEIGHT / 2))
-
-class Basket(pg.sprite.Sprite):
-    def __init__(self, x, y, image_path, player_id):
-        super().__init__()
-        self.score = 0
-        self.width = 70
-        self.height = 100
-        original_image = pg.image.load(image_path).convert_alpha()
-        self.image = pg.transform.scale(original_image, (self.width, self.height))
-        self.rect = self.image.get_rect(topleft=(x, y))
-        self.player_id = player_id
-
-    def update(self, item_list):
-        collided_items = pg.sprite.spritecollide(self, item_list, True)
-        for _item in collided_items:
-            self.score += 1
-
-    def draw_score(self, surface):
-        text = font_medium.render(str(self.score), False, COLOR_DICT["Black"])
-        text_rect = text.get_rect(center=(self.rect.x + self.width // 2, self.rect.y + self.height // 2))
-        surface.blit(text, text_rect)
+class TextCache:
+    def __init__(self, max_entries=TEXT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.surfaces = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        cache_key = (font, text, antialias, tuple(color))
+        text_surface = self.surfaces.get(cache_key)
+        if text_surface is None:
+            self.misses += 1
+            text_surface = font.render(text, antialias, color)
+            self.surfaces[cache_key] = text_surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.hits += 1
+            self.surfaces.move_to_end(cache_key)
+        return text_surface
+
+    def get_stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.surfaces)}
+
+    def clear(self):
+        self.surfaces.clear()
+
+text_cache = TextCache()
+
+def draw_interpolated_sprites(surface, sprites, alpha):
+    rects = []
+    for sprite in sprites:
+        image, rect = sprite.get_draw_state(alpha)
+        surface.blit(image, rect)
+        rects.append(rect)
+    return rects
+
+joystick_calibration = JoystickCalibration((PLAYER_TICK_MOVE_SPEED, PLAYER_TICK_MOVE_SPEED, PLAYER_TICK_ROTATE_SPEED) *
+                                          MAX_PLAYER_COUNT, JOYSTICK_CALIBRATION_FILE)
+controller_layouts = {}
+
+def get_controller_layout():
+    reader = controller.reader
+    field_count = reader.field_count if reader else 0
+    layout = controller_layouts.get(field_count)
+    if layout is None:
+        layout = controller_layouts[field_count] = controller_player_fields(field_count)
+    return layout
 
 class EndGame:
-    def __init__(self, basket1, basket2):
+    def __init__(self, baskets):
         self.w = 600
-        self.h = 400
+        self.h = 400 + max(0, len(baskets) - 2) * 40
         self.x = WIDTH // 2 - self.w // 2
         self.y = HEIGHT // 2 - self.h // 2
         
-        self.msg1 = font_large.render("Game Over!", True, COLOR_DICT["Black"])
-        self.msg2 = font_small.render(f"Player Blue Score: {basket1.score}", True, COLOR_DICT["Blue"])
-        self.msg3 = font_small.render(f"Player Red Score: {basket2.score}", True, COLOR_DICT["Red"])
-        
+        self.msg1 = text_cache.render(font_large, "Game Over!", True, COLOR_DICT["Black"])
         self.msg1_rect = self.msg1.get_rect(center=(WIDTH // 2, self.y + self.h // 4))
-        self.msg2_rect = self.msg2.get_rect(center=(WIDTH // 2, self.y + self.h // 2))
-        self.msg3_rect = self.msg3.get_rect(center=(WIDTH // 2, self.y + self.h * 3 // 4))
+
+        row_spacing = self.h // 4 if len(baskets) <= 2 else 40
+        self.score_lines = []
+        for index, basket in enumerate(baskets):
+            team = index % 2
+            name = TEAM_NAMES[team] if len(baskets) <= 2 else f"{index + 1} ({TEAM_NAMES[team]})"
+            text = text_cache.render(font_small, f"Player {name} Score: {basket.score}", True,
+                                     COLOR_DICT[TEAM_COLORS[team]])
+            self.score_lines.append((text, text.get_rect(center=(WIDTH // 2, self.y + self.h // 2 + index * row_spacing))))
 
     def draw(self, surface):
-        pg.draw.rect(surface, COLOR_DICT["White"], (self.x, self.y, self.w, self.h))
+        panel_rect = pg.draw.rect(surface, COLOR_DICT["White"], (self.x, self.y, self.w, self.h))
         surface.blit(self.msg1, self.msg1_rect)
-        surface.blit(self.msg2, self.msg2_rect)
-        surface.blit(self.msg3, self.msg3_rect)
+        for text, text_rect in self.score_lines:
+            surface.blit(text, text_rect)
+        return panel_rect
     
-    def trigger_score_send(self, player1_score, player2_score):
-        total_score = player1_score + player2_score
+    def trigger_score_send(self, scores):
+        total_score = sum(scores)
         timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
         data = {"score": total_score, "timestamp": timestamp}
         send_scores_to_scoreboard(data)
 
-class TMinus:
-    def __init__(self, total_time_seconds=60):
-        self.total_time = total_time_seconds
-        self.time_left = total_time_seconds
-        self.is_playing = True
-
-    def update(self, delta_time_ms):
-        if self.is_playing:
-            self.time_left -= delta_time_ms / 1000
-            if self.time_left <= 0:
-                self.time_left = 0
-                self.is_playing = False
-
-    def draw(self, surface):
-        minutes = int(self.time_left // 60)
-        seconds = int(self.time_left % 60)
-        time_str = f"{minutes:02}:{seconds:02}"
-        
-        text = font_medium.render(time_str, True, COLOR_DICT["Black"])
-        text_rect = text.get_rect(center=(WIDTH // 2, 50))
-        
-        padding = 20
-        bg_rect = pg.Rect(text_rect.x - padding, text_rect.y - padding,
-                            text_rect.width + 2 * padding, text_rect.height + 2 * padding)
-        pg.draw.rect(surface, COLOR_DICT["Gray"], bg_rect, border_radius=5)
-        
-        surface.blit(text, text_rect)
-
 class MenuButton:
     def __init__(self, x, y, width, height, player_id):
         self.rect = pg.Rect(x, y, width, height)
         self.player_id = player_id
         self.is_ready = False
-        self.initial_text = "Press to Ready!"
+        compact = width < MENU_BUTTON_COMPACT_WIDTH
+        self.font = font_small if compact else font_medium
+        self.initial_text = "Ready?" if compact else "Press to Ready!"
         self.ready_text = "Ready"
         self._update_text_surface()
 
     def _update_text_surface(self):
         current_text = self.ready_text if self.is_ready else self.initial_text
-        self.text_surface = font_medium.render(current_text, True, COLOR_DICT["White"])
+        self.text_surface = text_cache.render(self.font, current_text, True, COLOR_DICT["White"])
         self.text_rect = self.text_surface.get_rect(center=self.rect.center)
 
     def draw(self, surface):
@@ -421,320 +218,464 @@ class MenuButton:
         self._update_text_surface()
 
 class MainMenu:
-    def __init__(self):
-        self.player1_img = pg.transform.scale(pg.image.load("assets/player2.png").convert_alpha(), (350, 150))
-        self.player2_img = pg.transform.scale(pg.image.load("assets/player1.png").convert_alpha(), (350, 150))
-
-        self.player1_rect = self.player1_img.get_rect(center=(WIDTH // 4 + 30, HEIGHT // 2 - 100))
-        self.player2_rect = self.player2_img.get_rect(center=(WIDTH * 3 // 4 + 30, HEIGHT // 2 - 100))
-
-        button_width = 280
+    def __init__(self, player_count=PLAYER_COUNT):
+        column_width = WIDTH // player_count
+        image_width = min(350, column_width - 20)
+        image_size = (image_width, image_width * 150 // 350)
+        button_width = min(280, column_width - 20)
         button_height = 80
-        self.button1 = MenuButton(WIDTH // 4 - button_width // 2, HEIGHT // 2 + 50, button_width, button_height, 1)
-        self.button2 = MenuButton(WIDTH * 3 // 4 - button_width // 2, HEIGHT // 2 + 50, button_width, button_height, 2)
+
+        self.player_images = []
+        self.buttons = []
+        for index in range(player_count):
+            column_center = column_width * index + column_width // 2
+            image = assets.get(TEAM_ASSETS[index % 2][0], image_size)
+            self.player_images.append((image, image.get_rect(center=(column_center + 30, HEIGHT // 2 - 100))))
+            self.buttons.append(MenuButton(column_center - button_width // 2, HEIGHT // 2 + 50,
+                                           button_width, button_height, index + 1))
 
     def draw(self, surface):
         surface.fill(COLOR_DICT["DarkGray"])
-        surface.blit(self.player1_img, self.player1_rect)
-        surface.blit(self.player2_img, self.player2_rect)
-        self.button1.draw(surface)
-        self.button2.draw(surface)
+        for image, image_rect in self.player_images:
+            surface.blit(image, image_rect)
+        for button in self.buttons:
+            button.draw(surface)
 
     def handle_mouse_click(self, pos):
-        self.button1.handle_click(pos)
-        self.button2.handle_click(pos)
+        for button in self.buttons:
+            button.handle_click(pos)
 
-    def both_players_ready(self):
-        return self.button1.is_ready and self.button2.is_ready
+    def all_players_ready(self):
+        return all(button.is_ready for button in self.buttons)
     
     def reset_buttons(self):
-        self.button1.reset()
-        self.button2.reset()
-
-class GameState:
-    MAIN_MENU = 0
-    COUNTDOWN = 1
-    PLAYING = 2
-    GAME_OVER = 3
-
-    def __init__(self):
-        self.state = self.MAIN_MENU
-        self.countdown_start_time = 0
-        self.current_countdown_value = COUNTDOWN_TIME
-
-    def set_state(self, new_state):
-        self.state = new_state
-        if new_state == self.COUNTDOWN:
-            self.countdown_start_time = get_time_ms()
-            self.current_countdown_value = COUNTDOWN_TIME
-
-    def get_state(self):
-        return self.state
-    
-    def update_countdown(self):
-        if self.state == self.COUNTDOWN:
-            elapsed_time = (get_time_ms() - self.countdown_start_time) / 1000
-            self.current_countdown_value = COUNTDOWN_TIME - math.ceil(elapsed_time)
-            if self.current_countdown_value <= 0:
-                self.set_state(self.PLAYING)
-
-    def draw_countdown(self, surface):
-        if self.state == self.COUNTDOWN:
-            countdown_text = str(max(1, self.current_countdown_value))
-            text_surface = font_countdown.render(countdown_text, True, COLOR_DICT["Red"])
-            text_rect = text_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-            surface.blit(text_surface, text_rect)
+        for button in self.buttons:
+            button.reset()
 
 game_state_manager = GameState()
 
-def reset_game():
-    global player1, player2, gripper1, gripper2, pool, basket1, basket2, play_time, end_game_screen
-    
-    background_sprites.empty()
-    item_list.empty()
-    player_sprites.empty()
+def draw_basket_score(surface, basket):
+    text = text_cache.render(font_medium, str(basket.score), False, COLOR_DICT["Black"])
+    text_rect = text.get_rect(center=(basket.rect.x + basket.width // 2, basket.rect.y + basket.height // 2))
+    surface.blit(text, text_rect)
+    return text_rect
+
+def draw_match_clock(surface, play_time):
+    minutes = int(play_time.time_left // 60)
+    seconds = int(play_time.time_left % 60)
+    time_str = f"{minutes:02}:{seconds:02}"
     
-    basket_width = 70
-    player_display_width = 150
+    text = text_cache.render(font_medium, time_str, True, COLOR_DICT["Black"])
+    text_rect = text.get_rect(center=(WIDTH // 2, 50))
     
-    basket1_x = 50
-    basket1_y = HEIGHT / 2 - 50
-    basket2_x = WIDTH - 50 - basket_width
-    basket2_y = HEIGHT / 2 - 50
-
-    pool_center_x = WIDTH // 2
-    pool_center_y = HEIGHT // 2
-    pool_radius = 200
-
-    distance_from_pool_edge = 100
+    padding = 20
+    bg_rect = pg.Rect(text_rect.x - padding, text_rect.y - padding,
+                        text_rect.width + 2 * padding, text_rect.height + 2 * padding)
+    pg.draw.rect(surface, COLOR_DICT["Gray"], bg_rect, border_radius=5)
     
-    player1_x = pool_center_x - pool_radius - distance_from_pool_edge
-    player1_y = HEIGHT / 2
+    surface.blit(text, text_rect)
+    return bg_rect
+
+def draw_countdown(surface, game_state):
+    if game_state.get_state() == GameState.COUNTDOWN:
+        countdown_text = str(max(1, game_state.current_countdown_value))
+        text_surface = text_cache.render(font_countdown, countdown_text, True, COLOR_DICT["Red"])
+        text_rect = text_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+        surface.blit(text_surface, text_rect)
+        return text_rect
+    return None
 
-    player2_x = pool_center_x + pool_radius + distance_from_pool_edge
-    player2_y = HEIGHT / 2
+class DirtyRectRenderer:
+    def __init__(self):
+        self.background = None
+        self.previous_rects = []
+        self.full_redraw = True
+
+    def bake_background(self, background_sprites):
+        if self.background is None or self.background.get_size() != screen.get_size():
+            self.background = pg.Surface(screen.get_size()).convert()
+        self.background.fill(COLOR_DICT["LightGray"])
+        background_sprites.draw(self.background)
+        self.invalidate()
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def draw(self, surface, item_list, player_sprites, draw_overlays, alpha=1.0):
+        if self.full_redraw:
+            surface.blit(self.background, (0, 0))
+            item_list.draw(surface)
+            self.previous_rects = draw_interpolated_sprites(surface, player_sprites, alpha) + draw_overlays(surface)
+            item_list.pop_changed_rects()
+            self.full_redraw = False
+            return None
 
-    player1 = Player(player1_x, player1_y, "assets/player2.png", "assets/player2_griped.png", 1, 1.5)
-    player2 = Player(player2_x, player2_y, "assets/player1.png", "assets/player1_griped.png", 2, 1.5)
-    gripper1 = Gripper(player1, 1)
-    gripper2 = Gripper(player2, 2)
+        dirty_rects = self.previous_rects + item_list.pop_changed_rects()
+        for rect in dirty_rects:
+            surface.blit(self.background, rect, rect)
+        item_list.draw_rects(surface, dirty_rects)
+
+        current_rects = draw_interpolated_sprites(surface, player_sprites, alpha) + draw_overlays(surface)
+        self.previous_rects = current_rects
+        return dirty_rects + current_rects
+
+frame_timer = FrameTimer(enabled=FRAME_TIMING)
+show_frame_timing = False
+frame_timing_overlay = None
+
+def render_frame_timing_overlay(stats):
+    columns = ("p50", "p95", "p99", "max")
+    line_height = font_overlay.get_linesize()
+    overlay = pg.Surface((90 + len(columns) * 58, line_height * (len(stats) + 1) + 10))
+    overlay.fill(COLOR_DICT["Black"])
+    header = ["ms"] + list(columns)
+    rows = [header] + [[phase] + [f"{phase_stats[column]:.2f}" for column in columns]
+                       for phase, phase_stats in stats.items()]
+    for row_index, row in enumerate(rows):
+        for column_index, cell in enumerate(row):
+            color = COLOR_DICT["Orange"] if row_index == 0 or column_index == 0 else COLOR_DICT["White"]
+            text = font_overlay.render(cell, True, color)
+            x = 5 if column_index == 0 else 90 + (column_index - 1) * 58
+            overlay.blit(text, (x, 5 + row_index * line_height))
+    return overlay
+
+def draw_frame_timing_overlay(surface):
+    global frame_timing_overlay
+    if not show_frame_timing or not frame_timer.frame_count:
+        return None
+    if frame_timing_overlay is None or frame_timer.frame_count % FRAME_TIMING_OVERLAY_REFRESH == 0:
+        frame_timing_overlay = render_frame_timing_overlay(frame_timer.get_stats())
+    return surface.blit(frame_timing_overlay, (10, 10))
+
+def draw_playfield_overlays(surface):
+    rects = [draw_basket_score(surface, basket) for basket in match.baskets]
+    rects.append(draw_match_clock(surface, match.play_time))
+    countdown_rect = draw_countdown(surface, game_state_manager)
+    if countdown_rect:
+        rects.append(countdown_rect)
+    if game_state_manager.get_state() == GameState.GAME_OVER and end_game_screen:
+        rects.append(end_game_screen.draw(surface))
+    overlay_rect = draw_frame_timing_overlay(surface)
+    if overlay_rect:
+        rects.append(overlay_rect)
+    return rects
 
-    pool = Pool()
-    basket1 = Basket(basket1_x, basket1_y, "assets/player2_basket.png", 1)
-    basket2 = Basket(basket2_x, basket2_y, "assets/player1_basket.png", 2)
+def reset_game():
+    global match, end_game_screen, simulation_accumulator, match_recorder, grab_pending
+
+    item_list = None
+    if ITEM_STORE == "arrays":
+        from item_arrays import ItemArrayStore
+        item_list = ItemArrayStore()
+    if match_replay:
+        match = match_replay.create_match(item_list)
+    elif netplay_session:
+        match = Match(netplay_session.match_time_seconds, item_list, seed=netplay_session.seed,
+                      player_count=PLAYER_COUNT)
+        netplay_session.start(match)
+    else:
+        match = Match(item_list=item_list, player_count=PLAYER_COUNT)
+    if RECORD_MATCHES and not match_replay:
+        match_recorder = MatchRecorder(new_recording_path(), match.seed, match.match_time_seconds, match.player_count)
+    if ROTATION_CACHE_WARM:
+        match.warm_rotation_cache()
+    playfield_renderer.bake_background(match.background_sprites)
 
-    background_sprites.add(pool, basket1, basket2)
-    player_sprites.add(player1, gripper1, player2, gripper2)
-    
-    play_time = TMinus(total_time_seconds=60)
     end_game_screen = None
     timer_manager.timers.clear()
+    simulation_accumulator = 0
+    grab_pending = [False] * PLAYER_COUNT
+
+def update_netplay_menu(local_ready):
+    global netplay_transport, netplay_session
+    local_button = main_menu.buttons[NETPLAY_LOCAL_PLAYER]
+    if local_ready and not local_button.is_ready:
+        local_button.is_ready = True
+        local_button._update_text_surface()
+    if not local_button.is_ready:
+        return
 
-background_sprites = pg.sprite.Group()
-item_list = pg.sprite.Group()
-player_sprites = pg.sprite.Group()
+    if netplay_session is None:
+        if netplay_transport is None:
+            netplay_transport = NetplayTransport(NETPLAY_PORT, parse_address(NETPLAY_PEER))
+        netplay_session = RollbackSession(netplay_transport, NETPLAY_LOCAL_PLAYER)
+        print(f"Waiting for the other kiosk at {NETPLAY_PEER}...")
+    netplay_session.poll()
+    netplay_session.send()
+    if netplay_session.peer_timed_out():
+        print(f"No answer from the other kiosk at {NETPLAY_PEER}; press ready to try again")
+        netplay_session = None
+        main_menu.reset_buttons()
+        return
 
+    peer_button = main_menu.buttons[1 - NETPLAY_LOCAL_PLAYER]
+    if netplay_session.peer_confirmed and not peer_button.is_ready:
+        peer_button.is_ready = True
+        peer_button._update_text_surface()
+
+def abandon_netplay_match():
+    global netplay_session, match_recorder
+    print(f"Lost contact with the other kiosk, abandoning the match. Netplay stats: {netplay_session.get_stats()}")
+    netplay_session = None
+    match_recorder = None
+    game_state_manager.set_state(GameState.MAIN_MENU)
+    main_menu.reset_buttons()
+
+def end_match():
+    global end_game_screen
+    replayed = match_replay is not None
+    finish_match_recording()
+    game_state_manager.set_state(GameState.GAME_OVER)
+    end_game_screen = EndGame(match.baskets)
+    if not replayed:
+        end_game_screen.trigger_score_send(match.get_scores())
+    timer_manager.set_timer("game_over_reset", GAME_OVER_RESET_DELAY)
+
+def finish_match_recording():
+    global match_recorder, match_replay
+    if match_recorder:
+        match_recorder.close()
+        match_recorder = None
+    match_replay = None
+
+assets.load_atlas()
 main_menu = MainMenu()
+playfield_renderer = DirtyRectRenderer()
+startup_timer.mark("menu assets")
 
-player1 = None
-player2 = None
-gripper1 = None
-gripper2 = None
-pool = None
-basket1 = None
-basket2 = None
-play_time = None
+match = None
 end_game_screen = None
+match_recorder = None
+match_replay = None
+grab_pending = [False] * PLAYER_COUNT
+netplay_transport = None
+netplay_session = None
 
-setup_serial()
+if __name__ == "__main__":
+    if NETPLAY_PEER and PLAYER_COUNT != 2:
+        raise SystemExit("Networked play is two kiosks with one player each; set PLAYER_COUNT = 2")
 
-running = True
-last_tick = get_time_ms()
+    main_menu.draw(screen)
+    pg.display.flip()
+    startup_timer.mark("first frame")
+    startup_timer.report()
+
+    threading.Thread(target=start_background_services, daemon=True).start()
+
+    if REPLAY_FILE:
+        match_replay = MatchReplay(REPLAY_FILE)
+        print(f"Replaying {REPLAY_FILE} (seed {match_replay.seed})")
+        game_state_manager.set_state(GameState.COUNTDOWN)
+        reset_game()
+
+    running = True
+    last_tick = get_time_ms()
+    simulation_accumulator = 0
+
+    while running:
+        frame_timer.begin_frame()
+        current_tick = get_time_ms()
+        delta_time = current_tick - last_tick
+        last_tick = current_tick
+
+        arduino_data = read_arduino_data()
+        arduino_presses = read_arduino_button_presses()
+        controller_layout = get_controller_layout()[:PLAYER_COUNT]
+
+        forward_speeds = [0] * PLAYER_COUNT
+        strafe_speeds = [0] * PLAYER_COUNT
+        rotate_speeds = [0] * PLAYER_COUNT
+        grab_actions = [False] * PLAYER_COUNT
+        ready_actions = [False] * PLAYER_COUNT
+
+        for index, (_x, _y, _rotate, ready_field, grab_field) in enumerate(controller_layout):
+            grab_actions[index] = grab_field in arduino_presses
+            ready_actions[index] = ready_field in arduino_presses
+
+        keyboard_players = range(min(PLAYER_COUNT, len(KEYBOARD_CONTROLS)))
+        if arduino_data:
+            if controller.device_id != joystick_calibration.device_id:
+                joystick_calibration.select_device(controller.device_id, len(arduino_data))
+            if game_state_manager.get_state() == GameState.MAIN_MENU:
+                joystick_calibration.observe(arduino_data)
+
+            tables = joystick_calibration.tables
+            for index, (x_field, y_field, rotate_field, ready_field, _grab) in enumerate(controller_layout):
+                ready_actions[index] = ready_actions[index] or (arduino_data[ready_field] == 1)
+                forward_speeds[index] = tables[y_field][arduino_data[y_field]]
+                strafe_speeds[index] = tables[x_field][arduino_data[x_field]]
+                rotate_speeds[index] = tables[rotate_field][arduino_data[rotate_field]]
+            keyboard_players = range(len(controller_layout), min(PLAYER_COUNT, len(KEYBOARD_CONTROLS)))
+
+        if keyboard_players:
+            keys = pg.key.get_pressed()
+            for index in keyboard_players:
+                forward, backward, left, right, rotate_left, rotate_right, _grab, _ready = KEYBOARD_CONTROLS[index]
+
+                if keys[forward]:
+                    forward_speeds[index] = PLAYER_TICK_MOVE_SPEED
+                elif keys[backward]:
+                    forward_speeds[index] = -PLAYER_TICK_MOVE_SPEED
+
+                if keys[left]:
+                    strafe_speeds[index] = -PLAYER_TICK_MOVE_SPEED
+                elif keys[right]:
+                    strafe_speeds[index] = PLAYER_TICK_MOVE_SPEED
+
+                if keys[rotate_left]:
+                    rotate_speeds[index] = -PLAYER_TICK_ROTATE_SPEED
+                elif keys[rotate_right]:
+                    rotate_speeds[index] = PLAYER_TICK_ROTATE_SPEED
+
+        frame_timer.mark("input")
+
+        for event in pg.event.get():
+            if event.type == pg.QUIT:
+                running = False
+            if event.type == pg.KEYDOWN:
+                if event.key == pg.K_ESCAPE:
+                    running = False
+                if event.key == FRAME_TIMING_OVERLAY_KEY and frame_timer.enabled:
+                    show_frame_timing = not show_frame_timing
+                    frame_timing_overlay = None
+
+                if game_state_manager.get_state() == GameState.MAIN_MENU:
+                    for index, button in enumerate(main_menu.buttons[:len(KEYBOARD_CONTROLS)]):
+                        if event.key == KEYBOARD_CONTROLS[index][7] and not button.is_ready:
+                            ready_actions[index] = True
+
+                elif game_state_manager.get_state() == GameState.PLAYING:
+                    for index in range(min(PLAYER_COUNT, len(KEYBOARD_CONTROLS))):
+                        if event.key == KEYBOARD_CONTROLS[index][6]:
+                            grab_actions[index] = True
+
+        frame_timer.mark("events")
+
+        if game_state_manager.get_state() == GameState.MAIN_MENU:
+            if NETPLAY_PEER:
+                update_netplay_menu(any(ready_actions))
+            else:
+                for button, ready_action in zip(main_menu.buttons, ready_actions):
+                    if ready_action:
+                        button.is_ready = True
+                        button._update_text_surface()
+
+            if main_menu.all_players_ready():
+                joystick_calibration.finish()
+                game_state_manager.set_state(GameState.COUNTDOWN)
+                reset_game()
+
+        elif game_state_manager.get_state() == GameState.COUNTDOWN:
+            if netplay_session:
+                netplay_session.poll()
+                netplay_session.send()
+                if netplay_session.peer_timed_out():
+                    abandon_netplay_match()
+            game_state_manager.update_countdown()
+
+        elif game_state_manager.get_state() == GameState.PLAYING:
+            for index, grab_action in enumerate(grab_actions):
+                grab_pending[index] = grab_pending[index] or grab_action
+
+            simulation_accumulator = min(simulation_accumulator + delta_time,
+                                         MAX_SIMULATION_STEPS_PER_FRAME * SIMULATION_STEP_MS)
+            if netplay_session:
+                # input slot 0 drives this kiosk's player; the peer's inputs come over the network
+                netplay_session.poll()
+                while simulation_accumulator >= SIMULATION_STEP_MS:
+                    local_controls = (forward_speeds[0], strafe_speeds[0], rotate_speeds[0], grab_pending[0])
+                    if not netplay_session.advance(local_controls):
+                        break
+                    simulation_accumulator -= SIMULATION_STEP_MS
+                    grab_pending = [False] * PLAYER_COUNT
+                netplay_session.send()
+                if netplay_session.is_finished():
+                    if match_recorder:
+                        for controls in netplay_session.match_controls():
+                            match_recorder.record(controls)
+                    end_match()
+                elif netplay_session.peer_timed_out():
+                    abandon_netplay_match()
 
-while running:
-    current_tick = get_time_ms()
-    delta_time = current_tick - last_tick
-    last_tick = current_tick
+            else:
+                while simulation_accumulator >= SIMULATION_STEP_MS:
+                    simulation_accumulator -= SIMULATION_STEP_MS
+                    if match_replay:
+                        controls = match_replay.next_controls()
+                    else:
+                        controls = tuple(zip(forward_speeds, strafe_speeds, rotate_speeds, grab_pending))
+                        grab_pending = [False] * PLAYER_COUNT
+                    if match_recorder:
+                        match_recorder.record(controls)
+                    if not match.step(*controls):
+                        end_match()
+                        break
+
+        elif game_state_manager.get_state() == GameState.GAME_OVER:
+            if netplay_session:
+                # keep answering so the other kiosk gets our last inputs
+                netplay_session.poll()
+                netplay_session.send()
+            if timer_manager.check_timer("game_over_reset"):
+                game_state_manager.set_state(GameState.MAIN_MENU)
+                main_menu.reset_buttons()
+                if netplay_session:
+                    print(f"Netplay stats: {netplay_session.get_stats()}")
+                    netplay_session = None
+
+        spectator_server.publish_match(match, game_state_manager.get_state())
+        frame_timer.mark("simulation")
+
+        render_alpha = 1.0
+        if game_state_manager.get_state() == GameState.PLAYING:
+            render_alpha = simulation_accumulator / SIMULATION_STEP_MS
+
+        update_rects = None
+        if game_state_manager.get_state() == GameState.MAIN_MENU:
+            main_menu.draw(screen)
+            draw_frame_timing_overlay(screen)
+
+        elif DIRTY_RECT_RENDERING:
+            update_rects = playfield_renderer.draw(screen, match.item_list, match.player_sprites,
+                                                   draw_playfield_overlays, render_alpha)
 
-    arduino_data = read_arduino_data()
-    
-    p1_move_forward_backward = 0
-    p1_move_left_right = 0
-    p1_rotate_speed = 0
-    p1_grab_action = False
-    p1_ready_action = False
-
-    p2_move_forward_backward = 0
-    p2_move_left_right = 0
-    p2_rotate_speed = 0
-    p2_grab_action = False
-    p2_ready_action = False
-
-    if arduino_data and len(arduino_data) >= 10:
-        p1_move_x_arduino = arduino_data[0]
-        p1_move_y_arduino = arduino_data[1]
-        p1_rotate_x_arduino = arduino_data[2]
-        
-        p2_move_x_arduino = arduino_data[3]
-        p2_move_y_arduino = arduino_data[4]
-        p2_rotate_x_arduino = arduino_data[5]
-
-        p1_ready_action = (arduino_data[6] == 1)
-        p1_grab_action = (arduino_data[7] == 1)
-        p2_ready_action = (arduino_data[8] == 1)
-        p2_grab_action = (arduino_data[9] == 1)
-
-        p1_move_forward_backward = map_joystick_to_speed(p1_move_y_arduino, player1.move_speed)
-        p1_move_left_right = map_joystick_to_speed(p1_move_x_arduino, player1.move_speed)
-        p1_rotate_speed = map_joystick_to_speed(p1_rotate_x_arduino, player1.rotate_speed)
-        
-        p2_move_forward_backward = map_joystick_to_speed(p2_move_y_arduino, player2.move_speed)
-        p2_move_left_right = map_joystick_to_speed(p2_move_x_arduino, player2.move_speed)
-        p2_rotate_speed = map_joystick_to_speed(p2_rotate_x_arduino, player2.rotate_speed)
+        else:
+            screen.fill(COLOR_DICT["LightGray"])
+            match.background_sprites.draw(screen)
+            match.item_list.draw(screen)
+            draw_interpolated_sprites(screen, match.player_sprites, render_alpha)
+            draw_playfield_overlays(screen)
 
-    else:
-        keys = pg.key.get_pressed()
-        
-        if keys[pg.K_w]:
-            p1_move_forward_backward = player1.move_speed
-        elif keys[pg.K_s]:
-            p1_move_forward_backward = -player1.move_speed
-        
-        if keys[pg.K_a]:
-            p1_move_left_right = -player1.move_speed
-        elif keys[pg.K_d]:
-            p1_move_left_right = player1.move_speed
-
-        if keys[pg.K_q]:
-            p1_rotate_speed = -player1.rotate_speed
-        elif keys[pg.K_e]:
-            p1_rotate_speed = player1.rotate_speed
-
-        if keys[pg.K_UP]:
-            p2_move_forward_backward = player2.move_speed
-        elif keys[pg.K_DOWN]:
-            p2_move_forward_backward = -player2.move_speed
-
-        if keys[pg.K_LEFT]:
-            p2_move_left_right = -player2.move_speed
-        elif keys[pg.K_RIGHT]:
-            p2_move_left_right = player2.move_speed
-
-        if keys[pg.K_KP4]:
-            p2_rotate_speed = -player2.rotate_speed
-        elif keys[pg.K_KP6]:
-            p2_rotate_speed = player2.rotate_speed
-        
-    for event in pg.event.get():
-        if event.type == pg.QUIT:
-            running = False
-            server_running = False
-        if event.type == pg.KEYDOWN:
-            if event.key == pg.K_ESCAPE:
-                running = False
-                server_running = False
-            
-            if game_state_manager.get_state() == GameState.MAIN_MENU:
-                if event.key == pg.K_LSHIFT and not main_menu.button1.is_ready:
-                    p1_ready_action = True 
-                if event.key == pg.K_RSHIFT and not main_menu.button2.is_ready:
-                    p2_ready_action = True
-            
-            elif game_state_manager.get_state() == GameState.PLAYING:
-                if event.key == pg.K_f:
-                    p1_grab_action = True
-                if event.key == pg.K_m:
-                    p2_grab_action = True
-
-    if game_state_manager.get_state() == GameState.MAIN_MENU:
-        if p1_ready_action:
-            main_menu.button1.is_ready = True
-            main_menu.button1._update_text_surface()
-        if p2_ready_action:
-            main_menu.button2.is_ready = True
-            main_menu.button2._update_text_surface()
-
-        if main_menu.both_players_ready():
-            game_state_manager.set_state(GameState.COUNTDOWN)
-            reset_game()
-
-    elif game_state_manager.get_state() == GameState.COUNTDOWN:
-        game_state_manager.update_countdown()
-        
-    elif game_state_manager.get_state() == GameState.PLAYING:
-        play_time.update(delta_time)
-
-        if play_time.is_playing:
-            player1.update(p1_move_forward_backward, p1_move_left_right, p1_rotate_speed)
-            player2.update(p2_move_forward_backward, p2_move_left_right, p2_rotate_speed)
-            
-            gripper1.update(player1)
-            gripper2.update(player2)
-
-            if p1_grab_action:
-                gripper1.set_key_pressed()
-            if p2_grab_action:
-                gripper2.set_key_pressed()
-            
-            gripper1.handle_grip_action(item_list)
-            gripper2.handle_grip_action(item_list)
-            
-            basket1.update(item_list)
-            basket2.update(item_list)
-
-            if timer_manager.check_and_reset_timer("item_spawn", ITEM_SPAWN_INTERVAL):
-                item_list.add(Item())
+        frame_timer.mark("draw")
+
+        if update_rects is None:
+            pg.display.flip()
         else:
-            game_state_manager.set_state(GameState.GAME_OVER)
-            end_game_screen = EndGame(basket1, basket2)
-            end_game_screen.trigger_score_send(basket1.score, basket2.score)
-            timer_manager.set_timer("game_over_reset", GAME_OVER_RESET_DELAY)
+            pg.display.update(update_rects)
 
-    elif game_state_manager.get_state() == GameState.GAME_OVER:
-        if timer_manager.check_timer("game_over_reset"):
-            game_state_manager.set_state(GameState.MAIN_MENU)
-            main_menu.reset_buttons()
+        frame_timer.mark("present")
 
-    screen.fill(COLOR_DICT["LightGray"])
+        clock.tick(FPS)
 
-    if game_state_manager.get_state() == GameState.MAIN_MENU:
-        main_menu.draw(screen)
-    
-    elif game_state_manager.get_state() == GameState.COUNTDOWN:
-        background_sprites.draw(screen)
-        item_list.draw(screen)
-        player_sprites.draw(screen)
-        basket1.draw_score(screen)
-        basket2.draw_score(screen)
-        play_time.draw(screen)
-        game_state_manager.draw_countdown(screen)
-        
-    elif game_state_manager.get_state() == GameState.PLAYING:
-        background_sprites.draw(screen)
-        item_list.draw(screen)
-        player_sprites.draw(screen)
-
-        basket1.draw_score(screen)
-        basket2.draw_score(screen)
-        play_time.draw(screen)
-
-    elif game_state_manager.get_state() == GameState.GAME_OVER:
-        background_sprites.draw(screen)
-        item_list.draw(screen)
-        player_sprites.draw(screen)
-        basket1.draw_score(screen)
-        basket2.draw_score(screen)
-        play_time.draw(screen)
-        
-        if end_game_screen:
-            end_game_screen.draw(screen)
+        frame_timer.mark("wait")
+        frame_timer.end_frame()
 
-    pg.display.flip()
+    finish_match_recording()
+    print(f"Text cache stats: {text_cache.get_stats()}")
+    print(f"Asset stats: {assets.get_stats()}")
+    if frame_timer.enabled and frame_timer.frame_count:
+        print(f"Frame timing (ms): {frame_timer.get_stats()['total']}")
+        if FRAME_TIMING_DUMP:
+            frame_timer.dump(FRAME_TIMING_DUMP)
 
-    clock.tick(FPS)
+    print(f"Controller stats: {controller.get_stats()}")
+    controller.stop()
 
-if ser:
-    ser.close()
-    print("Serial port closed.")
+    score_store.stop()
+    score_publisher.stop()
+    print(f"Spectator stats: {spectator_server.get_stats()}")
+    spectator_server.stop()
+    if netplay_transport:
+        netplay_transport.close()
 
-pg.quit()
\ No newline at end of file
+    pg.quit()
\ No newline at end of file
@@ -0,0 +1,53 @@
+import math
+import random
+from game_engine import NO_INPUT
+
+GREEDY_GRAB_DISTANCE = 14
+GREEDY_STOP_DISTANCE = 10
+GREEDY_DRIVE_ANGLE = 45
+GREEDY_GRAB_CHANCE = 0.5
+
+class RandomBot:
+    def __init__(self, seed=None, grab_chance=0.02):
+        self.rng = random.Random(seed)
+        self.grab_chance = grab_chance
+
+    def __call__(self, match):
+        rng = self.rng
+        controls = []
+        for player in match.players:
+            controls.append((rng.choice((-player.move_speed, 0, player.move_speed)),
+                             rng.choice((-player.move_speed, 0, player.move_speed)),
+                             rng.choice((-player.rotate_speed, 0, player.rotate_speed)),
+                             rng.random() < self.grab_chance))
+        return controls
+
+class GreedyBot:
+    def __init__(self, seed=None, grab_chance=GREEDY_GRAB_CHANCE):
+        self.rng = random.Random(seed)
+        self.grab_chance = grab_chance
+
+    def __call__(self, match):
+        states = match.states
+        items = None
+        controls = []
+        for index, (player, basket) in enumerate(zip(match.players, match.baskets)):
+            gripper_x, gripper_y = states.gripper_x[index], states.gripper_y[index]
+            if states.has_item[index]:
+                target_x, target_y = basket.rect.center
+            else:
+                if items is None:
+                    items = match.item_list.item_centers()
+                if not items:
+                    controls.append(NO_INPUT)
+                    continue
+                target_x, target_y = min(items, key=lambda item: (item[0] - gripper_x) ** 2 + (item[1] - gripper_y) ** 2)
+
+            dx, dy = target_x - gripper_x, target_y - gripper_y
+            turn = (math.degrees(math.atan2(dy, dx)) - states.angle[index] + 180) % 360 - 180
+            distance = math.hypot(dx, dy)
+            forward = player.move_speed if abs(turn) < GREEDY_DRIVE_ANGLE and distance > GREEDY_STOP_DISTANCE else 0
+            rotate = max(-player.rotate_speed, min(player.rotate_speed, turn))
+            grab = distance < GREEDY_GRAB_DISTANCE and self.rng.random() < self.grab_chance
+            controls.append((forward, 0, rotate, grab))
+        return controls
@@ -0,0 +1,123 @@
+import os
+import struct
+import time
+from game_engine import Match, NO_INPUT, DEFAULT_PLAYER_COUNT
+
+RECORDINGS_DIR = "recordings"
+RECORDING_MAGIC = b'GGRC'
+RECORDING_VERSION = 2
+
+# magic, version, rng seed, match length in seconds, player count
+RECORDING_HEADER = struct.Struct('<4sBIHB')
+# version 1 recordings were always two players and had no player count
+RECORDING_HEADER_V1 = struct.Struct('<4sBIH')
+MAX_RUN_LENGTH = 0xFFFF
+
+def recording_run_struct(player_count):
+    # ticks this input is held for, (forward, strafe, rotate) per player, grab bits
+    return struct.Struct(f'<H{3 * player_count}dB')
+
+def new_recording_path(directory=RECORDINGS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, time.strftime('match-%Y%m%d-%H%M%S.ggr'))
+
+class MatchRecorder:
+    def __init__(self, path, seed, match_time_seconds, player_count=DEFAULT_PLAYER_COUNT):
+        self.path = path
+        self.run_struct = recording_run_struct(player_count)
+        self.data = bytearray(RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, seed, match_time_seconds,
+                                                    player_count))
+        self.current = None
+        self.repeat = 0
+        self.tick_count = 0
+
+    def record(self, controls):
+        controls = tuple(tuple(player_controls) for player_controls in controls)
+        self.tick_count += 1
+        if controls == self.current and self.repeat < MAX_RUN_LENGTH:
+            self.repeat += 1
+            return
+        self._flush_run()
+        self.current = controls
+        self.repeat = 1
+
+    def _flush_run(self):
+        if not self.repeat:
+            return
+        values = []
+        grab_bits = 0
+        for index, player_controls in enumerate(self.current):
+            values += player_controls[:3]
+            if player_controls[3]:
+                grab_bits |= 1 << index
+        self.data += self.run_struct.pack(self.repeat, *values, grab_bits)
+        self.repeat = 0
+
+    def close(self):
+        self._flush_run()
+        try:
+            with open(self.path, 'wb') as recording_file:
+                recording_file.write(self.data)
+            print(f"Saved match recording to {self.path} ({self.tick_count} ticks, {len(self.data)} bytes)")
+        except OSError as e:
+            print(f"Could not save match recording: {e}")
+
+class MatchReplay:
+    def __init__(self, path):
+        with open(path, 'rb') as recording_file:
+            data = recording_file.read()
+        magic, version, self.seed, self.match_time_seconds = RECORDING_HEADER_V1.unpack_from(data)
+        if magic != RECORDING_MAGIC or version not in (1, RECORDING_VERSION):
+            raise ValueError(f"{path} is not a match recording this build can play")
+        if version == 1:
+            self.player_count = 2
+            header_size = RECORDING_HEADER_V1.size
+        else:
+            self.player_count = RECORDING_HEADER.unpack_from(data)[4]
+            header_size = RECORDING_HEADER.size
+        self.runs = []
+        for repeat, *values, grab_bits in recording_run_struct(self.player_count).iter_unpack(data[header_size:]):
+            controls = tuple((values[index * 3], values[index * 3 + 1], values[index * 3 + 2],
+                              bool(grab_bits & (1 << index))) for index in range(self.player_count))
+            self.runs.append((repeat, controls))
+        self.run_index = 0
+        self.run_remaining = self.runs[0][0] if self.runs else 0
+
+    def create_match(self, item_list=None):
+        return Match(self.match_time_seconds, item_list, seed=self.seed, player_count=self.player_count)
+
+    def is_finished(self):
+        return self.run_index >= len(self.runs)
+
+    def next_controls(self):
+        if self.is_finished():
+            return (NO_INPUT,) * self.player_count
+        _repeat, controls = self.runs[self.run_index]
+        self.run_remaining -= 1
+        if not self.run_remaining:
+            self.run_index += 1
+            if self.run_index < len(self.runs):
+                self.run_remaining = self.runs[self.run_index][0]
+        return controls
+
+    def input_callback(self, match):
+        return self.next_controls()
+
+def replay_match(path, item_list=None):
+    replay = MatchReplay(path)
+    match = replay.create_match(item_list)
+    match.run(replay.input_callback)
+    return match
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Usage: python match_recording.py <recording.ggr>")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    match = replay_match(sys.argv[1])
+    elapsed = time.perf_counter() - start
+    print(f"Seed: {match.seed}, scores: {match.get_scores()}, ticks: {match.tick_count}, "
+          f"{match.tick_count / elapsed:.0f} ticks/s ({elapsed:.2f}s)")
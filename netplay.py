@@ -0,0 +1,458 @@
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import heapq
+import random
+import socket
+import struct
+import time
+import zlib
+from game_engine import Match, NO_INPUT, MATCH_TIME_SECONDS, SIMULATION_STEP_MS
+
+NETPLAY_PORT = 12347
+# local inputs are scheduled this many ticks ahead so most of them reach the peer before they are needed
+NETPLAY_INPUT_DELAY = 2
+# how far the local match may run ahead of the peer's confirmed inputs before it waits (16 ticks = 8 frames)
+NETPLAY_MAX_ROLLBACK = 16
+NETPLAY_MAX_INPUTS_PER_PACKET = 64
+NETPLAY_HELLO_INTERVAL = 0.1
+NETPLAY_KEEPALIVE_INTERVAL = 0.1
+# seconds without a packet before the other kiosk is treated as gone
+NETPLAY_PEER_TIMEOUT = 5.0
+NETPLAY_CHECKSUM_INTERVAL = 120
+RECV_SIZE = 2048
+
+PACKET_HELLO = ord('H')
+PACKET_INPUT = ord('I')
+# type, the sender's session nonce, the nonce the sender has heard from us (0 until then)
+PACKET_HEADER = struct.Struct('<BII')
+# player the sender owns, match seed, match length in seconds
+HELLO = struct.Struct('<BIH')
+# next tick the sender needs from us, first tick in this packet, input count, checksum tick, checksum
+INPUT_HEADER = struct.Struct('<IIBII')
+# forward, strafe, rotate, grab
+INPUT = struct.Struct('<fffB')
+NO_CHECKSUM = 0xFFFFFFFF
+
+def quantize_controls(controls):
+    # both kiosks must simulate the exact floats that went over the wire
+    forward, strafe, rotate, grab = INPUT.unpack(INPUT.pack(controls[0], controls[1], controls[2], bool(controls[3])))
+    return forward, strafe, rotate, bool(grab)
+
+def match_checksum(match):
+    states = match.states
+    crc = zlib.crc32(struct.pack(f'<I{match.player_count}H', match.tick_count, *match.get_scores()))
+    for column in (states.x, states.y, states.angle, states.has_item):
+        crc = zlib.crc32(column.tobytes(), crc)
+    return zlib.crc32(repr(sorted(match.item_list.item_centers())).encode(), crc)
+
+def parse_address(address, default_port=NETPLAY_PORT):
+    host, _, port = address.rpartition(":")
+    if not host:
+        return address, default_port
+    return host, int(port)
+
+class NetplayTransport:
+    def __init__(self, local_port, peer_address, latency_ms=0, jitter_ms=0, loss=0.0, seed=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('0.0.0.0', local_port))
+        self.sock.setblocking(False)
+        self.peer_address = peer_address
+        # latency, jitter and loss are injected on the sending side for testing over loopback
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.delayed = []
+        self.delayed_count = 0
+        self.packets_sent = 0
+        self.packets_dropped = 0
+        self.packets_received = 0
+        self.bytes_sent = 0
+
+    def send(self, data):
+        self.packets_sent += 1
+        self.bytes_sent += len(data)
+        if self.loss and self.rng.random() < self.loss:
+            self.packets_dropped += 1
+            return
+        delay = self.latency + self.rng.uniform(0, self.jitter) if self.jitter else self.latency
+        if delay <= 0:
+            self._send_now(data)
+            return
+        heapq.heappush(self.delayed, (time.perf_counter() + delay, self.delayed_count, data))
+        self.delayed_count += 1
+
+    def flush(self):
+        now = time.perf_counter()
+        while self.delayed and self.delayed[0][0] <= now:
+            self._send_now(heapq.heappop(self.delayed)[2])
+
+    def _send_now(self, data):
+        try:
+            self.sock.sendto(data, self.peer_address)
+        except OSError:
+            # nothing listening on the other kiosk yet
+            pass
+
+    def receive(self):
+        self.flush()
+        packets = []
+        while True:
+            try:
+                data, _address = self.sock.recvfrom(RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                continue
+            packets.append(data)
+        self.packets_received += len(packets)
+        return packets
+
+    def get_stats(self):
+        return {"sent": self.packets_sent, "dropped": self.packets_dropped, "received": self.packets_received,
+                "bytes_sent": self.bytes_sent}
+
+    def close(self):
+        self.sock.close()
+
+class RollbackSession:
+    def __init__(self, transport, local_player, seed=None, match_time_seconds=MATCH_TIME_SECONDS,
+                 input_delay=NETPLAY_INPUT_DELAY, max_rollback=NETPLAY_MAX_ROLLBACK):
+        if local_player not in (0, 1):
+            raise ValueError("local_player must be 0 or 1")
+        self.transport = transport
+        self.local_player = local_player
+        self.remote_player = 1 - local_player
+        # player 0's kiosk picks the match, the other one adopts it from the hello
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.match_time_seconds = match_time_seconds
+        self.max_rollback = max_rollback
+        self.nonce = random.getrandbits(32) or 1
+        self.peer_nonce = 0
+        self.connected = False
+        # the peer only sends inputs once it has heard us, so an input packet means both sides are connected
+        self.peer_confirmed = False
+        self.last_heard = time.perf_counter()
+        self.match = None
+
+        self.no_input = quantize_controls(NO_INPUT)
+        self.local_inputs = [self.no_input] * input_delay
+        self.remote_inputs = []
+        self.peer_needs = 0
+        self.predicted = {}
+        self.snapshots = {}
+        self.rollback_tick = None
+        self.last_send = 0
+        self.sent_confirmed = -1
+
+        self.checksums = {}
+        self.final_checksums = {}
+        self.remote_checksums = {}
+        self.final_checksum = None
+        self.last_checked_tick = -1
+        self.checksums_matched = 0
+        self.desyncs = 0
+
+        self.rollbacks = 0
+        self.resimulated_ticks = 0
+        self.max_rollback_depth = 0
+        self.stalls = 0
+
+    def start(self, match):
+        self.match = match
+
+    def poll(self):
+        for data in self.transport.receive():
+            self._handle_packet(data)
+        if self.rollback_tick is not None and self.match:
+            self._rollback()
+        self._finalize_checksums()
+
+    def _handle_packet(self, data):
+        if len(data) < PACKET_HEADER.size:
+            return
+        kind, sender_nonce, heard_nonce = PACKET_HEADER.unpack_from(data)
+        if kind == PACKET_HELLO:
+            if len(data) < PACKET_HEADER.size + HELLO.size or self.connected and sender_nonce != self.peer_nonce:
+                return
+            player, seed, match_time_seconds = HELLO.unpack_from(data, PACKET_HEADER.size)
+            if player == self.local_player:
+                print(f"Netplay peer also plays as player {player + 1}; set a different NETPLAY_LOCAL_PLAYER on it")
+                return
+            self.peer_nonce = sender_nonce
+            self.last_heard = time.perf_counter()
+            if self.local_player != 0:
+                self.seed = seed
+                self.match_time_seconds = match_time_seconds
+            if heard_nonce == self.nonce:
+                self._set_connected()
+            return
+
+        if kind != PACKET_INPUT or sender_nonce != self.peer_nonce or heard_nonce != self.nonce:
+            return
+        if len(data) < PACKET_HEADER.size + INPUT_HEADER.size:
+            return
+        self._set_connected()
+        self.peer_confirmed = True
+        self.last_heard = time.perf_counter()
+        peer_needs, first_tick, count, checksum_tick, checksum = INPUT_HEADER.unpack_from(data, PACKET_HEADER.size)
+        self.peer_needs = max(self.peer_needs, peer_needs)
+        offset = PACKET_HEADER.size + INPUT_HEADER.size
+        count = min(count, (len(data) - offset) // INPUT.size)
+        for tick in range(first_tick, first_tick + count):
+            if tick == len(self.remote_inputs):
+                forward, strafe, rotate, grab = INPUT.unpack_from(data, offset)
+                controls = (forward, strafe, rotate, bool(grab))
+                self.remote_inputs.append(controls)
+                predicted = self.predicted.pop(tick, None)
+                if predicted is not None and predicted != controls and (self.rollback_tick is None
+                                                                        or tick < self.rollback_tick):
+                    self.rollback_tick = tick
+            offset += INPUT.size
+
+        if checksum_tick != NO_CHECKSUM and checksum_tick > self.last_checked_tick:
+            self.remote_checksums[checksum_tick] = checksum
+            self._compare_checksum(checksum_tick)
+
+    def _set_connected(self):
+        if not self.connected:
+            self.connected = True
+            print(f"Netplay connected to {self.transport.peer_address} as player {self.local_player + 1} "
+                  f"(seed {self.seed})")
+
+    def _predict(self):
+        if not self.remote_inputs:
+            return self.no_input
+        forward, strafe, rotate, _grab = self.remote_inputs[-1]
+        return forward, strafe, rotate, False
+
+    def _step(self, tick):
+        controls = [None, None]
+        controls[self.local_player] = self.local_inputs[tick]
+        if tick < len(self.remote_inputs):
+            controls[self.remote_player] = self.remote_inputs[tick]
+        else:
+            controls[self.remote_player] = self.predicted[tick] = self._predict()
+            self.snapshots[tick] = self.match.save_state()
+        playing = self.match.step(*controls)
+        if self.match.tick_count % NETPLAY_CHECKSUM_INTERVAL == 0:
+            self.checksums[self.match.tick_count] = match_checksum(self.match)
+        return playing
+
+    def advance(self, local_controls):
+        match = self.match
+        if match.is_over():
+            return False
+        tick = match.tick_count
+        if tick - len(self.remote_inputs) >= self.max_rollback:
+            self.stalls += 1
+            return False
+        self.local_inputs.append(quantize_controls(local_controls))
+        self._step(tick)
+        return True
+
+    def _rollback(self):
+        match = self.match
+        start = self.rollback_tick
+        end = match.tick_count
+        self.rollback_tick = None
+        match.restore_state(self.snapshots[start])
+        for tick in [tick for tick in self.snapshots if tick >= start]:
+            del self.snapshots[tick]
+        for tick in range(start, end):
+            self._step(tick)
+        self.rollbacks += 1
+        self.resimulated_ticks += end - start
+        self.max_rollback_depth = max(self.max_rollback_depth, end - start)
+
+    def _finalize_checksums(self):
+        confirmed = len(self.remote_inputs)
+        for tick in [tick for tick in self.snapshots if tick < confirmed]:
+            del self.snapshots[tick]
+        for tick in sorted(self.checksums):
+            if tick > confirmed:
+                break
+            self.final_checksums[tick] = self.checksums.pop(tick)
+            self.final_checksum = (tick, self.final_checksums[tick])
+            self._compare_checksum(tick)
+
+    def _compare_checksum(self, tick):
+        if tick not in self.final_checksums or tick not in self.remote_checksums:
+            return
+        checksum = self.final_checksums[tick]
+        for checked in [checked for checked in self.final_checksums if checked <= tick]:
+            del self.final_checksums[checked]
+        self.last_checked_tick = tick
+        if checksum == self.remote_checksums.pop(tick):
+            self.checksums_matched += 1
+        else:
+            self.desyncs += 1
+            print(f"Netplay desync at tick {tick}: the kiosks no longer agree on the match state")
+
+    def send(self):
+        now = time.perf_counter()
+        if not self.connected:
+            if now - self.last_send >= NETPLAY_HELLO_INTERVAL:
+                self.last_send = now
+                self.transport.send(PACKET_HEADER.pack(PACKET_HELLO, self.nonce, self.peer_nonce) +
+                                    HELLO.pack(self.local_player, self.seed, self.match_time_seconds))
+            self.transport.flush()
+            return
+
+        pending = len(self.local_inputs) - self.peer_needs
+        confirmed = len(self.remote_inputs)
+        if pending > 0 or confirmed != self.sent_confirmed or now - self.last_send >= NETPLAY_KEEPALIVE_INTERVAL:
+            self.last_send = now
+            self.sent_confirmed = confirmed
+            count = max(0, min(pending, NETPLAY_MAX_INPUTS_PER_PACKET))
+            checksum_tick, checksum = self.final_checksum or (NO_CHECKSUM, 0)
+            parts = [PACKET_HEADER.pack(PACKET_INPUT, self.nonce, self.peer_nonce),
+                     INPUT_HEADER.pack(confirmed, self.peer_needs, count, checksum_tick, checksum)]
+            parts += [INPUT.pack(*controls) for controls in self.local_inputs[self.peer_needs:self.peer_needs + count]]
+            self.transport.send(b''.join(parts))
+        self.transport.flush()
+
+    def peer_timed_out(self):
+        return time.perf_counter() - self.last_heard > NETPLAY_PEER_TIMEOUT
+
+    def peer_has_all_inputs(self):
+        return self.peer_needs >= len(self.local_inputs)
+
+    def is_finished(self):
+        return (self.match is not None and self.match.is_over() and not self.predicted
+                and self.rollback_tick is None)
+
+    def match_controls(self):
+        ticks = min(len(self.local_inputs), len(self.remote_inputs), self.match.tick_count if self.match else 0)
+        controls = []
+        for tick in range(ticks):
+            tick_controls = [None, None]
+            tick_controls[self.local_player] = self.local_inputs[tick]
+            tick_controls[self.remote_player] = self.remote_inputs[tick]
+            controls.append(tuple(tick_controls))
+        return controls
+
+    def get_stats(self):
+        return {
+            "tick": self.match.tick_count if self.match else 0,
+            "confirmed": len(self.remote_inputs),
+            "rollbacks": self.rollbacks,
+            "resimulated_ticks": self.resimulated_ticks,
+            "max_rollback": self.max_rollback_depth,
+            "stalls": self.stalls,
+            "checksums_matched": self.checksums_matched,
+            "desyncs": self.desyncs,
+            "transport": self.transport.get_stats(),
+        }
+
+def play_bot_peer(local_player, local_port, peer_port, args, results):
+    from match_bots import GreedyBot
+
+    transport = NetplayTransport(local_port, ('127.0.0.1', peer_port), args.latency, args.jitter, args.loss,
+                                 seed=args.seed + local_player)
+    session = RollbackSession(transport, local_player, seed=args.seed, match_time_seconds=args.seconds,
+                              input_delay=args.input_delay, max_rollback=args.max_rollback)
+    deadline = time.perf_counter() + 10
+    while not session.peer_confirmed and time.perf_counter() < deadline:
+        session.poll()
+        session.send()
+        time.sleep(0.005)
+    if not session.peer_confirmed:
+        results.put((local_player, None))
+        return
+
+    match = Match(session.match_time_seconds, seed=session.seed)
+    session.start(match)
+    bot = GreedyBot(args.seed + local_player)
+    frame_seconds = 1 / args.fps
+    work_times = []
+    accumulator = 0
+    last = next_frame = time.perf_counter()
+    while True:
+        now = time.perf_counter()
+        accumulator = min(accumulator + (now - last) * 1000, args.max_steps * SIMULATION_STEP_MS)
+        last = now
+        session.poll()
+        while accumulator >= SIMULATION_STEP_MS:
+            if not session.advance(bot(match)[local_player]):
+                break
+            accumulator -= SIMULATION_STEP_MS
+        session.send()
+        work_times.append((time.perf_counter() - now) * 1000)
+        if session.is_finished():
+            break
+        if session.peer_timed_out():
+            results.put((local_player, None))
+            transport.close()
+            return
+        next_frame += frame_seconds
+        time.sleep(max(0, next_frame - time.perf_counter()))
+
+    linger_until = time.perf_counter() + 2
+    while not session.peer_has_all_inputs() and time.perf_counter() < linger_until:
+        time.sleep(frame_seconds)
+        session.poll()
+        session.send()
+    work_times.sort()
+    stats = session.get_stats()
+    stats["frame_work_ms"] = {"p50": work_times[len(work_times) // 2],
+                              "p99": work_times[int(len(work_times) * 0.99)], "max": work_times[-1]}
+    results.put((local_player, (match.get_scores(), match_checksum(match), session.match_controls(), stats)))
+    transport.close()
+
+def selftest(args):
+    import multiprocessing
+
+    results = multiprocessing.Queue()
+    ports = (args.port, args.port + 1)
+    peers = [multiprocessing.Process(target=play_bot_peer, args=(player, ports[player], ports[1 - player], args, results))
+             for player in (0, 1)]
+    for peer in peers:
+        peer.start()
+    outcomes = dict(results.get() for _ in peers)
+    for peer in peers:
+        peer.join()
+    if None in outcomes.values():
+        raise SystemExit("The two peers never connected or one of them went silent")
+
+    ok = True
+    for player in (0, 1):
+        scores, checksum, _controls, stats = outcomes[player]
+        print(f"Player {player + 1}: scores {scores}, {stats}")
+    (scores_0, checksum_0, controls_0, _), (scores_1, checksum_1, controls_1, _) = outcomes[0], outcomes[1]
+    if scores_0 != scores_1 or checksum_0 != checksum_1 or controls_0 != controls_1:
+        print("FAIL: the kiosks finished with different matches")
+        ok = False
+
+    # an offline replay of the confirmed inputs must land on the same match
+    match = Match(args.seconds, seed=args.seed)
+    for controls in controls_0:
+        match.step(*controls)
+    if not match.is_over() or match.get_scores() != scores_0 or match_checksum(match) != checksum_0:
+        print(f"FAIL: offline replay of the confirmed inputs scored {match.get_scores()}")
+        ok = False
+    if not ok:
+        raise SystemExit(1)
+    print(f"OK: both kiosks and the offline replay agree on {scores_0}")
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Play two bot kiosks against each other over UDP loopback "
+                                                 "with injected latency and loss, and check they stay in sync")
+    parser.add_argument("--latency", type=float, default=40, help="one-way latency in ms added to every packet")
+    parser.add_argument("--jitter", type=float, default=10, help="extra random delay in ms (reorders packets)")
+    parser.add_argument("--loss", type=float, default=0.05, help="fraction of packets dropped")
+    parser.add_argument("--seconds", type=int, default=20, help="match length")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=NETPLAY_PORT)
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--input-delay", type=int, default=NETPLAY_INPUT_DELAY)
+    parser.add_argument("--max-rollback", type=int, default=NETPLAY_MAX_ROLLBACK)
+    parser.add_argument("--max-steps", type=int, default=12, help="simulation steps allowed per frame")
+    selftest(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import selectors
+import socket
+import threading
+import collections
+import json
+import struct
+
+SUBSCRIBER_QUEUE_LIMIT = 256
+SELECT_TIMEOUT = 0.5
+RECV_SIZE = 4096
+SUBSCRIBER_INBOX_LIMIT = 4096
+FRAMING_NEWLINE = "newline"
+FRAMING_LENGTH = "length"
+LENGTH_PREFIX = struct.Struct('>I')
+
+class Subscriber:
+    def __init__(self, subscriber_id, sock, address):
+        self.id = subscriber_id
+        self.sock = sock
+        self.address = address
+        self.outbox = collections.deque()
+        self.inbox = bytearray()
+        self.framing = FRAMING_NEWLINE
+        self.sent_messages = 0
+
+class ScorePublisher:
+    def __init__(self, host, port, queue_limit=SUBSCRIBER_QUEUE_LIMIT):
+        self.host = host
+        self.port = port
+        self.queue_limit = queue_limit
+        self.selector = None
+        self.server_socket = None
+        self.subscribers = {}
+        self.next_subscriber_id = 1
+        self.replay_source = None
+        self.pending = collections.deque()
+        self.pending_lock = threading.Lock()
+        self.wake_reader, self.wake_writer = socket.socketpair()
+        self.wake_reader.setblocking(False)
+        self.wake_writer.setblocking(False)
+        self.running = False
+        self.thread = None
+        self.disconnected_slow = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake()
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def publish(self, data):
+        message = json.dumps(data).encode('utf-8') + b'\n'
+        with self.pending_lock:
+            self.pending.append((None, message))
+        self._wake()
+
+    def send_to(self, subscriber_id, messages):
+        encoded = [(subscriber_id, json.dumps(data).encode('utf-8') + b'\n') for data in messages]
+        with self.pending_lock:
+            self.pending.extend(encoded)
+        self._wake()
+
+    def get_subscriber_count(self):
+        return len(self.subscribers)
+
+    def _wake(self):
+        try:
+            self.wake_writer.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def _run(self):
+        self.selector = selectors.DefaultSelector()
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.server_socket.bind((self.host, self.port))
+            self.server_socket.listen()
+            self.server_socket.setblocking(False)
+            print(f"Game server listening on {self.host}:{self.port}")
+        except socket.error as e:
+            print(f"Failed to start game server: {e}")
+            self.server_socket.close()
+            self.running = False
+            return
+
+        self.selector.register(self.server_socket, selectors.EVENT_READ)
+        self.selector.register(self.wake_reader, selectors.EVENT_READ)
+
+        while self.running:
+            for key, mask in self.selector.select(SELECT_TIMEOUT):
+                if key.fileobj is self.server_socket:
+                    self._accept()
+                elif key.fileobj is self.wake_reader:
+                    self._drain_pending()
+                else:
+                    self._service_subscriber(key.data, mask)
+
+        for subscriber in list(self.subscribers.values()):
+            self._disconnect(subscriber)
+        self.selector.close()
+        self.server_socket.close()
+        print("Game server stopped.")
+
+    def _accept(self):
+        try:
+            conn, addr = self.server_socket.accept()
+        except (BlockingIOError, socket.error):
+            return
+        conn.setblocking(False)
+        subscriber = Subscriber(self.next_subscriber_id, conn, addr)
+        self.next_subscriber_id += 1
+        self.subscribers[subscriber.id] = subscriber
+        self.selector.register(conn, selectors.EVENT_READ, subscriber)
+        print(f"Scoreboard connected from {addr}")
+        if self.replay_source:
+            self.replay_source.request_replay(subscriber.id)
+
+    def _drain_pending(self):
+        try:
+            while self.wake_reader.recv(RECV_SIZE):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        with self.pending_lock:
+            messages = list(self.pending)
+            self.pending.clear()
+        for target, message in messages:
+            if target is None:
+                for subscriber in list(self.subscribers.values()):
+                    self._enqueue(subscriber, message)
+            elif target in self.subscribers:
+                self._enqueue(self.subscribers[target], message)
+
+    def _enqueue(self, subscriber, message):
+        if len(subscriber.outbox) >= self.queue_limit:
+            print(f"Scoreboard {subscriber.address} is too slow, disconnecting.")
+            self.disconnected_slow += 1
+            self._disconnect(subscriber)
+            return
+        if subscriber.framing == FRAMING_LENGTH:
+            message = LENGTH_PREFIX.pack(len(message) - 1) + message[:-1]
+        subscriber.outbox.append(memoryview(message))
+        self._flush(subscriber)
+
+    def _service_subscriber(self, subscriber, mask):
+        if mask & selectors.EVENT_READ:
+            try:
+                data = subscriber.sock.recv(RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                data = None
+            except socket.error:
+                data = b''
+            if data == b'':
+                print(f"Scoreboard {subscriber.address} disconnected.")
+                self._disconnect(subscriber)
+                return
+            if data:
+                subscriber.inbox += data
+                if not self._handle_requests(subscriber):
+                    return
+        if mask & selectors.EVENT_WRITE:
+            self._flush(subscriber)
+
+    def _handle_requests(self, subscriber):
+        while True:
+            end = subscriber.inbox.find(b'\n')
+            if end == -1:
+                break
+            line = bytes(subscriber.inbox[:end])
+            del subscriber.inbox[:end + 1]
+            try:
+                request = json.loads(line)
+                framing = request.get("framing")
+                since = request.get("since")
+                since = None if since is None else int(since)
+            except (ValueError, TypeError, AttributeError):
+                print(f"Ignoring invalid request from scoreboard {subscriber.address}: {line!r}")
+                continue
+            if framing == FRAMING_LENGTH and subscriber.framing != FRAMING_LENGTH:
+                self._enqueue(subscriber, json.dumps({"framing": FRAMING_LENGTH}).encode('utf-8') + b'\n')
+                subscriber.framing = FRAMING_LENGTH
+                if subscriber.id not in self.subscribers:
+                    return False
+            if since is not None and self.replay_source:
+                self.replay_source.request_replay(subscriber.id, since)
+        if len(subscriber.inbox) > SUBSCRIBER_INBOX_LIMIT:
+            print(f"Scoreboard {subscriber.address} sent an oversized request, disconnecting.")
+            self._disconnect(subscriber)
+            return False
+        return True
+
+    def _flush(self, subscriber):
+        while subscriber.outbox:
+            message = subscriber.outbox[0]
+            try:
+                sent = subscriber.sock.send(message)
+            except (BlockingIOError, InterruptedError):
+                break
+            except socket.error as e:
+                print(f"Error sending data to scoreboard {subscriber.address}: {e}. Closing connection.")
+                self._disconnect(subscriber)
+                return
+            if sent < len(message):
+                subscriber.outbox[0] = message[sent:]
+                break
+            subscriber.outbox.popleft()
+            subscriber.sent_messages += 1
+
+        events = selectors.EVENT_READ
+        if subscriber.outbox:
+            events |= selectors.EVENT_WRITE
+        self.selector.modify(subscriber.sock, events, subscriber)
+
+    def _disconnect(self, subscriber):
+        if self.subscribers.pop(subscriber.id, None) is None:
+            return
+        try:
+            self.selector.unregister(subscriber.sock)
+        except (KeyError, ValueError):
+            pass
+        subscriber.sock.close()
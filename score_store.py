@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+import queue
+
+SCORE_STORE_FILE = 'scores.db'
+SCORE_REPLAY_TOP_K = 5
+SCORE_REPLAY_SINCE_LIMIT = 1000
+
+class ScoreStore:
+    def __init__(self, publisher, path=SCORE_STORE_FILE, top_k=SCORE_REPLAY_TOP_K):
+        self.publisher = publisher
+        self.path = path
+        self.top_k = top_k
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.available = False
+        self.last_seq = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread:
+            self.jobs.put(None)
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def record(self, score_data):
+        self.jobs.put(("record", score_data))
+
+    def request_replay(self, subscriber_id, since=None):
+        self.jobs.put(("replay", subscriber_id, since))
+
+    def _open(self):
+        try:
+            db = sqlite3.connect(self.path)
+            db.execute("CREATE TABLE IF NOT EXISTS results ("
+                       "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                       "score INTEGER NOT NULL, "
+                       "timestamp TEXT NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS results_by_score ON results (score DESC, seq)")
+            db.commit()
+            self.last_seq = db.execute("SELECT COALESCE(MAX(seq), 0) FROM results").fetchone()[0]
+            print(f"Score store opened at {self.path} ({self.last_seq} results)")
+            return db
+        except sqlite3.Error as e:
+            print(f"Could not open score store {self.path}: {e}. Scores will not be persisted.")
+            return None
+
+    def _run(self):
+        db = self._open()
+        self.available = db is not None
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            try:
+                if job[0] == "record":
+                    self._record(db, job[1])
+                else:
+                    self._replay(db, job[1], job[2])
+            except sqlite3.Error as e:
+                print(f"Score store error: {e}")
+        if db:
+            db.close()
+
+    def _record(self, db, score_data):
+        if db is None:
+            self.publisher.publish(score_data)
+            return
+        cursor = db.execute("INSERT INTO results (score, timestamp) VALUES (?, ?)",
+                            (score_data["score"], score_data["timestamp"]))
+        db.commit()
+        self.last_seq = cursor.lastrowid
+        self.publisher.publish(dict(score_data, seq=self.last_seq))
+
+    def _replay(self, db, subscriber_id, since):
+        if db is None:
+            return
+        if since is None:
+            rows = db.execute("SELECT seq, score, timestamp FROM results "
+                              "ORDER BY score DESC, seq LIMIT ?", (self.top_k,)).fetchall()
+        else:
+            rows = db.execute("SELECT seq, score, timestamp FROM results WHERE seq > ? "
+                              "ORDER BY seq LIMIT ?", (since, SCORE_REPLAY_SINCE_LIMIT)).fetchall()
+        replay = "top" if since is None else "since"
+        messages = [{"score": score, "timestamp": timestamp, "seq": seq, "replay": replay}
+                    for seq, score, timestamp in rows]
+        self.publisher.send_to(subscriber_id, messages)
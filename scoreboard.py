@@ -5,6 +5,9 @@ import socket
 import json
 import threading
 import collections
+import functools
+import heapq
+import struct
 
 WIDTH, HEIGHT = 600, 720
 
@@ -18,20 +21,38 @@ COLOR_DICT = {
     "Orange": (255, 165, 0)
 }
 
-GAME_SERVER_IP = input("Enter IP Address ")
+GAME_SERVER_IP = None
 GAME_SERVER_PORT = 12345
+HIGH_SCORES_LIMIT = 5
+SCORE_HISTORY_FILE = None
+FPS = 60
+IDLE_REDRAW_INTERVAL_MS = 1000
+RECV_BUFFER_SIZE = 65536
+FRAMING_NEWLINE = "newline"
+FRAMING_LENGTH = "length"
+SCORE_STREAM_FRAMING = FRAMING_NEWLINE
 pg.init()
 screen = pg.display.set_mode((WIDTH, HEIGHT))
 pg.display.set_caption("High Scores")
 font_large = pg.font.Font(None, int(HEIGHT * 0.12))
 font_medium = pg.font.Font(None, int(HEIGHT * 0.06))
 font_small = pg.font.Font(None, int(HEIGHT * 0.045))
+clock = pg.time.Clock()
+
+SCORES_UPDATED = pg.event.custom_type()
+
+PANEL_WIDTH = WIDTH * 0.85
+PANEL_HEIGHT = HEIGHT * 0.7
+PANEL_X = (WIDTH - PANEL_WIDTH) // 2
+PANEL_Y = HEIGHT * 0.25
+ROW_PADDING_Y = int(HEIGHT * 0.015)
+ROW_START_Y = PANEL_Y + PANEL_HEIGHT * 0.25
 
-received_scores_data = []
 scores_lock = threading.Lock()
 
 client_running = False
 client_socket = None
+last_seq = 0
 
 def format_timestamp_to_hms(timestamp_str):
     try:
@@ -40,23 +61,47 @@ def format_timestamp_to_hms(timestamp_str):
     except ValueError:
         return "N/A"
 
-def get_highest_scores(scores_list):
-    scores_list.sort(key=lambda x: x[0], reverse=True)
-    return scores_list
+class TopScores:
+    def __init__(self, limit=HIGH_SCORES_LIMIT):
+        self.limit = limit
+        self.heap = []
+        self.received_count = 0
 
-def draw_high_scores(surface, high_scores_data):
-    surface.fill(COLOR_DICT["DarkGray"])
+    def add(self, score, timestamp, seq=None):
+        if seq is not None and any(entry[1] == -seq for entry in self.heap):
+            return False
+        entry = (score, -(self.received_count if seq is None else seq), timestamp)
+        self.received_count += 1
+        if len(self.heap) < self.limit:
+            heapq.heappush(self.heap, entry)
+            return True
+        return heapq.heappushpop(self.heap, entry) is not entry
+
+    def get_sorted(self):
+        return [(score, timestamp) for score, _order, timestamp in sorted(self.heap, reverse=True)]
+
+top_scores = TopScores()
+
+def append_score_history(score, timestamp):
+    if not SCORE_HISTORY_FILE:
+        return
+    try:
+        with open(SCORE_HISTORY_FILE, 'a', encoding='utf-8') as history_file:
+            history_file.write(json.dumps({"score": score, "timestamp": timestamp}) + '\n')
+    except OSError as e:
+        print(f"Could not write score history: {e}")
+
+def create_static_panel():
+    panel = pg.Surface((WIDTH, HEIGHT)).convert()
+    panel.fill(COLOR_DICT["DarkGray"])
 
     title_text = font_large.render("HIGH SCORES", True, COLOR_DICT["White"])
     title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT * 0.15))
-    surface.blit(title_text, title_rect)
+    panel.blit(title_text, title_rect)
 
-    panel_width = WIDTH * 0.85
-    panel_height = HEIGHT * 0.7
-    panel_x = (WIDTH - panel_width) // 2
-    panel_y = HEIGHT * 0.25
-    pg.draw.rect(surface, COLOR_DICT["Black"], (panel_x, panel_y, panel_width, panel_height), border_radius=int(HEIGHT * 0.015))
-    pg.draw.rect(surface, COLOR_DICT["LightGray"], (panel_x, panel_y, panel_width, panel_height), int(WIDTH * 0.005), border_radius=int(HEIGHT * 0.015))
+    panel_rect = (PANEL_X, PANEL_Y, PANEL_WIDTH, PANEL_HEIGHT)
+    pg.draw.rect(panel, COLOR_DICT["Black"], panel_rect, border_radius=int(HEIGHT * 0.015))
+    pg.draw.rect(panel, COLOR_DICT["LightGray"], panel_rect, int(WIDTH * 0.005), border_radius=int(HEIGHT * 0.015))
 
     header_font = font_medium
     
@@ -64,67 +109,166 @@ def draw_high_scores(surface, high_scores_data):
     header_text_score = header_font.render("Highest Score", True, COLOR_DICT["Yellow"])
     header_text_time = header_font.render("Time", True, COLOR_DICT["Orange"])
 
-    header_rank_rect = header_text_rank.get_rect(center=(panel_x + panel_width * 0.15, panel_y + panel_height * 0.1))
-    header_score_rect = header_text_score.get_rect(center=(panel_x + panel_width * 0.45, panel_y + panel_height * 0.1))
-    header_time_rect = header_text_time.get_rect(center=(panel_x + panel_width * 0.80, panel_y + panel_height * 0.1))
+    header_rank_rect = header_text_rank.get_rect(center=(PANEL_X + PANEL_WIDTH * 0.15, PANEL_Y + PANEL_HEIGHT * 0.1))
+    header_score_rect = header_text_score.get_rect(center=(PANEL_X + PANEL_WIDTH * 0.45, PANEL_Y + PANEL_HEIGHT * 0.1))
+    header_time_rect = header_text_time.get_rect(center=(PANEL_X + PANEL_WIDTH * 0.80, PANEL_Y + PANEL_HEIGHT * 0.1))
+
+    panel.blit(header_text_rank, header_rank_rect)
+    panel.blit(header_text_score, header_score_rect)
+    panel.blit(header_text_time, header_time_rect)
 
-    surface.blit(header_text_rank, header_rank_rect)
-    surface.blit(header_text_score, header_score_rect)
-    surface.blit(header_text_time, header_time_rect)
+    pg.draw.line(panel, COLOR_DICT["LightGray"], (PANEL_X + PANEL_WIDTH * 0.03, PANEL_Y + PANEL_HEIGHT * 0.18),
+                 (PANEL_X + PANEL_WIDTH * 0.97, PANEL_Y + PANEL_HEIGHT * 0.18), int(WIDTH * 0.004))
+    return panel
 
-    pg.draw.line(surface, COLOR_DICT["LightGray"], (panel_x + panel_width * 0.03, panel_y + panel_height * 0.18),
-                 (panel_x + panel_width * 0.97, panel_y + panel_height * 0.18), int(WIDTH * 0.004))
+def draw_score_cell(surface, text, cell_center_x, row_y, row_height):
+    text_width = text.get_width()
+    rect_outer = pg.Rect(cell_center_x - (text_width / 2) - ROW_PADDING_Y, row_y - ROW_PADDING_Y,
+                         text_width + 2 * ROW_PADDING_Y, row_height)
+    pg.draw.rect(surface, COLOR_DICT["DarkGray"], rect_outer, border_radius=int(HEIGHT * 0.008))
+    pg.draw.rect(surface, COLOR_DICT["LightGray"], rect_outer, 1, border_radius=int(HEIGHT * 0.008))
+    text_rect = text.get_rect(center=rect_outer.center)
+    surface.blit(text, text_rect)
+    return rect_outer
 
-    start_y_content = panel_y + panel_height * 0.25
-    row_padding_y = int(HEIGHT * 0.015)
+@functools.lru_cache(maxsize=HIGH_SCORES_LIMIT * 4)
+def render_score_row(row_index, rank, total_score, timestamp_str):
+    rank_text = font_medium.render(str(rank), True, COLOR_DICT["White"])
+    score_text = font_medium.render(str(total_score), True, COLOR_DICT["Green"])
+    time_text_formatted = format_timestamp_to_hms(timestamp_str)
+    time_text = font_small.render(time_text_formatted, True, COLOR_DICT["LightGray"])
+
+    max_height = max(rank_text.get_height(), score_text.get_height(), time_text.get_height())
+    row_height = max_height + 2 * ROW_PADDING_Y
+
+    current_row_y = ROW_START_Y + row_index * row_height
+
+    row_surface = pg.Surface((WIDTH, HEIGHT), pg.SRCALPHA)
+    cells = [
+        draw_score_cell(row_surface, rank_text, PANEL_X + PANEL_WIDTH * 0.15, current_row_y, row_height),
+        draw_score_cell(row_surface, score_text, PANEL_X + PANEL_WIDTH * 0.45, current_row_y, row_height),
+        draw_score_cell(row_surface, time_text, PANEL_X + PANEL_WIDTH * 0.80, current_row_y, row_height),
+    ]
+    row_rect = cells[0].unionall(cells[1:])
+    return row_surface.subsurface(row_rect).copy(), row_rect.topleft
+
+static_panel = None
+
+def draw_high_scores(surface, high_scores_data):
+    global static_panel
+    if static_panel is None:
+        static_panel = create_static_panel()
+    surface.blit(static_panel, (0, 0))
 
     current_rank = 1
 
-    for i, (total_score, timestamp_str) in enumerate(high_scores_data[:5]):
+    for i, (total_score, timestamp_str) in enumerate(high_scores_data[:HIGH_SCORES_LIMIT]):
         if i > 0 and total_score < high_scores_data[i-1][0]:
             current_rank = i + 1
 
-        rank_text = font_medium.render(str(current_rank), True, COLOR_DICT["White"])
-        score_text = font_medium.render(str(total_score), True, COLOR_DICT["Green"])
-        time_text_formatted = format_timestamp_to_hms(timestamp_str)
-        time_text = font_small.render(time_text_formatted, True, COLOR_DICT["LightGray"])
-
-        max_height = max(rank_text.get_height(), score_text.get_height(), time_text.get_height())
-        row_height = max_height + 2 * row_padding_y
-
-        current_row_y = start_y_content + i * row_height
-        
-        rank_text_width = rank_text.get_width()
-        rank_cell_center_x = panel_x + panel_width * 0.15
-        rank_rect_outer = pg.Rect(rank_cell_center_x - (rank_text_width / 2) - row_padding_y, current_row_y - row_padding_y,
-                                  rank_text_width + 2 * row_padding_y, row_height)
-        pg.draw.rect(surface, COLOR_DICT["DarkGray"], rank_rect_outer, border_radius=int(HEIGHT * 0.008))
-        pg.draw.rect(surface, COLOR_DICT["LightGray"], rank_rect_outer, 1, border_radius=int(HEIGHT * 0.008))
-        rank_text_rect = rank_text.get_rect(center=rank_rect_outer.center)
-        surface.blit(rank_text, rank_text_rect)
-
-        score_text_width = score_text.get_width()
-        score_cell_center_x = panel_x + panel_width * 0.45
-        score_rect_outer = pg.Rect(score_cell_center_x - (score_text_width / 2) - row_padding_y, current_row_y - row_padding_y,
-                                   score_text_width + 2 * row_padding_y, row_height)
-        pg.draw.rect(surface, COLOR_DICT["DarkGray"], score_rect_outer, border_radius=int(HEIGHT * 0.008))
-        pg.draw.rect(surface, COLOR_DICT["LightGray"], score_rect_outer, 1, border_radius=int(HEIGHT * 0.008))
-        score_text_rect = score_text.get_rect(center=score_rect_outer.center)
-        surface.blit(score_text, score_text_rect)
-
-        time_text_width = time_text.get_width()
-        time_cell_center_x = panel_x + panel_width * 0.80
-        time_rect_outer = pg.Rect(time_cell_center_x - (time_text_width / 2) - row_padding_y, current_row_y - row_padding_y,
-                                  time_text_width + 2 * row_padding_y, row_height)
-        pg.draw.rect(surface, COLOR_DICT["DarkGray"], time_rect_outer, border_radius=int(HEIGHT * 0.008))
-        pg.draw.rect(surface, COLOR_DICT["LightGray"], time_rect_outer, 1, border_radius=int(HEIGHT * 0.008))
-        time_text_rect = time_text.get_rect(center=time_rect_outer.center)
-        surface.blit(time_text, time_text_rect)
+        row_surface, row_position = render_score_row(i, current_rank, total_score, timestamp_str)
+        surface.blit(row_surface, row_position)
+
+LENGTH_PREFIX = struct.Struct('>I')
+FRAMING_ACK = json.dumps({"framing": FRAMING_LENGTH}).encode('utf-8')
+
+class FrameTooLarge(ValueError):
+    pass
+
+class ScoreStreamDecoder:
+    def __init__(self, size=RECV_BUFFER_SIZE):
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.reset()
+
+    def reset(self):
+        self.start = 0
+        self.end = 0
+        self.framing = FRAMING_NEWLINE
+
+    def recv_from(self, sock):
+        if self.end == len(self.buffer):
+            if self.start == 0:
+                raise FrameTooLarge(f"frame larger than {len(self.buffer)} bytes")
+            pending = self.end - self.start
+            self.buffer[:pending] = self.view[self.start:self.end]
+            self.start = 0
+            self.end = pending
+        received = sock.recv_into(self.view[self.end:])
+        self.end += received
+        return received
+
+    def pop_frames(self):
+        frames = []
+        while self.start < self.end:
+            if self.framing == FRAMING_LENGTH:
+                if self.end - self.start < LENGTH_PREFIX.size:
+                    break
+                length, = LENGTH_PREFIX.unpack_from(self.buffer, self.start)
+                if length > len(self.buffer) - LENGTH_PREFIX.size:
+                    raise FrameTooLarge(f"frame of {length} bytes announced")
+                frame_start = self.start + LENGTH_PREFIX.size
+                frame_end = frame_start + length
+                if frame_end > self.end:
+                    break
+                self.start = frame_end
+            else:
+                frame_start = self.start
+                frame_end = self.buffer.find(b'\n', frame_start, self.end)
+                if frame_end == -1:
+                    break
+                self.start = frame_end + 1
+                if frame_end == frame_start:
+                    continue
+                if self.view[frame_start:frame_end] == FRAMING_ACK:
+                    self.framing = FRAMING_LENGTH
+                    continue
+            frames.append(self.view[frame_start:frame_end])
+        if self.start == self.end:
+            self.start = self.end = 0
+        return frames
+
+def decode_frames(frames):
+    if not frames:
+        return []
+    try:
+        return json.loads(b'[' + b','.join(frames) + b']')
+    except ValueError:
+        pass
+    messages = []
+    for frame in frames:
+        try:
+            messages.append(json.loads(bytes(frame)))
+        except ValueError:
+            print(f"Invalid JSON received: {bytes(frame)!r}")
+    return messages
+
+def handle_score_message(received_data):
+    global current_display_scores, last_seq
+    if not isinstance(received_data, dict):
+        return
+    score = received_data.get('score')
+    timestamp = received_data.get('timestamp')
+    if score is None or timestamp is None:
+        return
+    seq = received_data.get('seq')
+    with scores_lock:
+        if top_scores.add(score, timestamp, seq):
+            current_display_scores = top_scores.get_sorted()
+            pg.event.post(pg.event.Event(SCORES_UPDATED))
+    if received_data.get('replay') == "top":
+        return
+    if seq is not None:
+        if seq <= last_seq:
+            return
+        last_seq = seq
+    print(f"Received score: {score}, Timestamp: {timestamp}")
+    append_score_history(score, timestamp)
 
 def connect_to_game_server():
     global client_socket, client_running
     client_running = True
-    buffer = ""
+    decoder = ScoreStreamDecoder()
     while client_running:
         if not client_socket:
             try:
@@ -132,6 +276,14 @@ def connect_to_game_server():
                 client_socket.settimeout(1)
                 client_socket.connect((GAME_SERVER_IP, GAME_SERVER_PORT))
                 print(f"Connected to game server at {GAME_SERVER_IP}:{GAME_SERVER_PORT}")
+                decoder.reset()
+                request = {}
+                if SCORE_STREAM_FRAMING == FRAMING_LENGTH:
+                    request["framing"] = FRAMING_LENGTH
+                if last_seq:
+                    request["since"] = last_seq
+                if request:
+                    client_socket.sendall(json.dumps(request).encode('utf-8') + b'\n')
             except socket.error as e:
                 print(f"Could not connect to game server: {e}. Retrying in 2 seconds...")
                 client_socket = None
@@ -139,28 +291,21 @@ def connect_to_game_server():
                 continue
 
         try:
-            data = client_socket.recv(4096).decode('utf-8')
-            if not data:
+            if not decoder.recv_from(client_socket):
                 print("Game server disconnected. Attempting to reconnect...")
                 client_socket.close()
                 client_socket = None
                 continue
-            
-            buffer += data
-            while '\n' in buffer:
-                line, buffer = buffer.split('\n', 1)
-                try:
-                    received_data = json.loads(line)
-                    score = received_data.get('score')
-                    timestamp = received_data.get('timestamp')
-                    if score is not None and timestamp is not None:
-                        with scores_lock:
-                            received_scores_data.append((score, timestamp))
-                            global current_display_scores
-                            current_display_scores = get_highest_scores(list(received_scores_data))[:5]
-                            print(f"Received score: {score}, Timestamp: {timestamp}")
-                except json.JSONDecodeError:
-                    print(f"Invalid JSON received: {line}")
+
+            frames = decoder.pop_frames()
+            for received_data in decode_frames(frames):
+                handle_score_message(received_data)
+            for frame in frames:
+                frame.release()
+        except FrameTooLarge as e:
+            print(f"Bad frame from game server: {e}. Reconnecting...")
+            client_socket.close()
+            client_socket = None
         except socket.timeout:
             pass
         except socket.error as e:
@@ -174,25 +319,33 @@ def connect_to_game_server():
         client_socket.close()
     print("Scoreboard client stopped.")
 
-client_thread = threading.Thread(target=connect_to_game_server, daemon=True)
-client_thread.start()
-
 current_display_scores = []
 
-running = True
-while running:
-    for event in pg.event.get():
-        if event.type == pg.QUIT:
-            running = False
-            client_running = False
-        if event.type == pg.KEYDOWN:
-            if event.key == pg.K_ESCAPE:
+if __name__ == "__main__":
+    GAME_SERVER_IP = input("Enter IP Address ")
+    client_thread = threading.Thread(target=connect_to_game_server, daemon=True)
+    client_thread.start()
+
+    running = True
+    needs_redraw = True
+    while running:
+        events = [pg.event.wait(IDLE_REDRAW_INTERVAL_MS)] + pg.event.get()
+        for event in events:
+            if event.type == pg.QUIT:
                 running = False
                 client_running = False
+            if event.type == pg.KEYDOWN:
+                if event.key == pg.K_ESCAPE:
+                    running = False
+                    client_running = False
+            if event.type in (pg.NOEVENT, SCORES_UPDATED, pg.WINDOWEXPOSED, pg.VIDEOEXPOSE):
+                needs_redraw = True
 
-    with scores_lock:
-        draw_high_scores(screen, current_display_scores)
-
-    pg.display.flip()
+        if needs_redraw:
+            with scores_lock:
+                draw_high_scores(screen, current_display_scores)
+            pg.display.flip()
+            needs_redraw = False
+            clock.tick(FPS)
 
-pg.quit()
\ No newline at end of file
+    pg.quit()
\ No newline at end of file
@@ -0,0 +1,144 @@
+import threading
+import time
+from serial_input import (SerialReader, CONTROLLER_HELLO, is_controller_field_count, BINARY_FRAME, BINARY_FRAME_SYNC,
+                          decode_binary_frame)
+
+# genuine Arduino Uno/Mega/Leonardo and Arduino.org boards are trusted without a handshake
+CONTROLLER_USB_IDS = {
+    (0x2341, 0x0043), (0x2341, 0x0001), (0x2341, 0x0010), (0x2341, 0x0042), (0x2341, 0x8036),
+    (0x2A03, 0x0043),
+}
+# CH340, FTDI and CP210x adapters are on clone boards but also on printers and scanners,
+# so they are tried early but must still pass the handshake
+USB_SERIAL_BRIDGE_IDS = {(0x1A86, 0x7523), (0x0403, 0x6001), (0x10C4, 0xEA60)}
+DISCOVERY_INTERVAL = 1.0
+HANDSHAKE_TIMEOUT = 3.0
+HANDSHAKE_BUFFER_LIMIT = 4096
+SERIAL_READ_TIMEOUT = 0.1
+
+def looks_like_controller(buffer):
+    if CONTROLLER_HELLO in buffer:
+        return True
+    for line in bytes(buffer).split(b'\n')[:-1]:
+        fields = line.strip().split(b',')
+        if is_controller_field_count(len(fields)) and all(field.isdigit() for field in fields):
+            return True
+    sync = buffer.find(BINARY_FRAME_SYNC)
+    while sync != -1 and len(buffer) - sync >= BINARY_FRAME.size:
+        if decode_binary_frame(memoryview(buffer), sync)[1] is not None:
+            return True
+        sync = buffer.find(BINARY_FRAME_SYNC, sync + 1)
+    return False
+
+class ControllerConnection:
+    def __init__(self, port=None, baud_rate=115200, use_binary=True, list_candidates=None):
+        self.port = port
+        self.baud_rate = baud_rate
+        self.use_binary = use_binary
+        self.list_candidates = list_candidates
+        self.ser = None
+        self.reader = None
+        self.device = None
+        self.device_id = None
+        self.device_ids = {}
+        self.connects = 0
+        self.rejected = set()
+        self.running = False
+        self.wake = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout=HANDSHAKE_TIMEOUT + 1)
+            self.thread = None
+        self._close()
+
+    def get_stats(self):
+        reader = self.reader
+        stats = reader.get_stats() if reader else {}
+        stats.update({"device": self.device, "connects": self.connects})
+        return stats
+
+    def _run(self):
+        while self.running:
+            reader = self.reader
+            if reader and not reader.running:
+                print(f"Controller on {self.device} disconnected, searching again...")
+                self._close()
+            if self.reader is None:
+                self._connect()
+            self.wake.wait(DISCOVERY_INTERVAL)
+
+    def _candidates(self):
+        if self.list_candidates:
+            return list(self.list_candidates()), set()
+        if self.port:
+            return [self.port], set()
+        from serial.tools import list_ports
+        ports = list_ports.comports()
+        self.device_ids = {p.device: f"{p.vid:04X}:{p.pid:04X}:{p.serial_number or p.device}"
+                           for p in ports if p.vid is not None}
+        known = [p.device for p in ports if (p.vid, p.pid) in CONTROLLER_USB_IDS]
+        bridges = [p.device for p in ports if (p.vid, p.pid) in USB_SERIAL_BRIDGE_IDS]
+        others = [p.device for p in ports if p.vid is not None and p.device not in known and p.device not in bridges]
+        return known + bridges + others, set(known)
+
+    def _connect(self):
+        import serial
+
+        candidates, trusted = self._candidates()
+        self.rejected &= set(candidates)
+        for device in candidates:
+            if device in self.rejected:
+                continue
+            try:
+                ser = serial.Serial(device, self.baud_rate, timeout=SERIAL_READ_TIMEOUT)
+            except (serial.SerialException, OSError):
+                continue
+            if device not in trusted and device != self.port and not self._handshake(ser):
+                print(f"{device} does not look like the controller, skipping it.")
+                self.rejected.add(device)
+                ser.close()
+                continue
+            self.ser = ser
+            self.device = device
+            self.device_id = self.device_ids.get(device, device)
+            self.reader = SerialReader(ser, use_binary=self.use_binary)
+            self.reader.start()
+            self.connects += 1
+            print(f"Connected to controller on {device}")
+            return True
+        return False
+
+    def _handshake(self, ser):
+        buffer = bytearray()
+        deadline = time.perf_counter() + HANDSHAKE_TIMEOUT
+        while self.running and time.perf_counter() < deadline:
+            try:
+                buffer += ser.read(max(1, ser.in_waiting))
+            except Exception:
+                return False
+            if looks_like_controller(buffer):
+                return True
+            if len(buffer) > HANDSHAKE_BUFFER_LIMIT:
+                del buffer[:-HANDSHAKE_BUFFER_LIMIT // 2]
+        return False
+
+    def _close(self):
+        reader, ser = self.reader, self.ser
+        self.reader = None
+        self.ser = None
+        if reader:
+            reader.stop()
+        if ser:
+            try:
+                ser.close()
+            except Exception:
+                pass
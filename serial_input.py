@@ -0,0 +1,290 @@
+import threading
+import time
+import struct
+import collections
+
+AXIS_MAX = 0x3FF
+# per player: x, y and rotate axes up front, then ready and grab buttons after every player's axes
+AXES_PER_PLAYER = 3
+FIELDS_PER_PLAYER = 5
+MAX_CONTROLLER_PLAYERS = 8
+FRAME_STALE_AFTER = 0.5
+EDGE_EVENT_BUFFER_SIZE = 64
+RATE_WINDOW = 1.0
+
+CONTROLLER_HELLO = b"GRABBING_CONTROLLER"
+
+PROTOCOL_CSV = "csv"
+PROTOCOL_BINARY = "binary"
+
+# sync, sequence, 6 x 10-bit axes + 4 button bits packed into 64 bits, checksum
+BINARY_FRAME = struct.Struct('<BBQB')
+BINARY_FRAME_SYNC = 0xA5
+BINARY_REQUEST = b'B'
+BINARY_REQUEST_INTERVAL = 0.5
+BINARY_REQUEST_ATTEMPTS = 8
+# bad checksums or skipped bytes in a row before the reader goes back to CSV
+BINARY_FALLBACK_FAILURES = 16
+AXIS_SHIFTS = (0, 10, 20, 30, 40, 50)
+BUTTON_SHIFTS = (60, 61, 62, 63)
+
+def decode_binary_frame(view, offset=0):
+    sync, seq, packed, checksum = BINARY_FRAME.unpack_from(view, offset)
+    if sync != BINARY_FRAME_SYNC:
+        return None, None
+    if sum(view[offset + 1:offset + BINARY_FRAME.size - 1]) & 0xFF != checksum:
+        return None, None
+    data = [(packed >> shift) & 0x3FF for shift in AXIS_SHIFTS]
+    data += [(packed >> shift) & 1 for shift in BUTTON_SHIFTS]
+    return seq, data
+
+def encode_binary_frame(seq, data):
+    packed = 0
+    for value, shift in zip(data[:6], AXIS_SHIFTS):
+        packed |= (value & 0x3FF) << shift
+    for value, shift in zip(data[6:], BUTTON_SHIFTS):
+        packed |= (1 if value else 0) << shift
+    frame = bytearray(BINARY_FRAME.pack(BINARY_FRAME_SYNC, seq & 0xFF, packed, 0))
+    frame[-1] = sum(frame[1:-1]) & 0xFF
+    return bytes(frame)
+
+def is_controller_field_count(field_count):
+    players, remainder = divmod(field_count, FIELDS_PER_PLAYER)
+    return remainder == 0 and 1 <= players <= MAX_CONTROLLER_PLAYERS
+
+def axis_field_count(field_count):
+    return field_count // FIELDS_PER_PLAYER * AXES_PER_PLAYER
+
+def controller_player_fields(field_count):
+    players = field_count // FIELDS_PER_PLAYER
+    axes = players * AXES_PER_PLAYER
+    return [(index * AXES_PER_PLAYER, index * AXES_PER_PLAYER + 1, index * AXES_PER_PLAYER + 2,
+             axes + index * 2, axes + index * 2 + 1) for index in range(players)]
+
+class SerialReader:
+    def __init__(self, ser, event_buffer_size=EDGE_EVENT_BUFFER_SIZE, use_binary=True):
+        self.ser = ser
+        self.use_binary = use_binary
+        self.protocol = PROTOCOL_CSV
+        self.binary_requests_sent = 0
+        self.last_binary_request = 0
+        self.binary_failures = 0
+        self.last_seq = None
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+        self.latest_frame = None
+        self.latest_frame_time = 0
+        self.latest_frame_consumed = True
+        self.edge_events = collections.deque(maxlen=event_buffer_size)
+        self.button_states = {}
+        self.field_count = 0
+
+        self.lines_read = 0
+        self.parse_errors = 0
+        self.dropped_lines = 0
+        self.dropped_events = 0
+        self.lost_frames = 0
+        self.read_rate = 0.0
+        self._rate_lines = 0
+        self._rate_start = time.perf_counter()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def _run(self):
+        buffer = bytearray()
+        while self.running:
+            self._negotiate_protocol()
+            try:
+                chunk = self.ser.read(max(1, self.ser.in_waiting))
+            except Exception as e:
+                print(f"Serial read error: {e}")
+                self.running = False
+                break
+
+            if chunk:
+                buffer += chunk
+                consumed = self.decode(buffer)
+                del buffer[:consumed]
+
+            self._update_read_rate()
+
+    def _negotiate_protocol(self):
+        if not self.use_binary or self.protocol == PROTOCOL_BINARY:
+            return
+        if self.binary_requests_sent >= BINARY_REQUEST_ATTEMPTS:
+            return
+        now = time.perf_counter()
+        if now - self.last_binary_request < BINARY_REQUEST_INTERVAL:
+            return
+        self.last_binary_request = now
+        self.binary_requests_sent += 1
+        try:
+            self.ser.write(BINARY_REQUEST)
+        except Exception as e:
+            print(f"Could not request binary controller protocol: {e}")
+            self.binary_requests_sent = BINARY_REQUEST_ATTEMPTS
+
+    def decode(self, buffer):
+        start = 0
+        while True:
+            if self.protocol == PROTOCOL_BINARY:
+                start = self._decode_binary(buffer, start)
+                if self.protocol == PROTOCOL_BINARY:
+                    return start
+            else:
+                sync = self._find_binary_frame(buffer, start)
+                if sync is None:
+                    return self._decode_csv(buffer, start, len(buffer))
+                if len(buffer) - sync < BINARY_FRAME.size:
+                    # wait for the rest of the frame before deciding what the controller is sending
+                    return self._decode_csv(buffer, start, sync)
+                self._decode_csv(buffer, start, sync)
+                self.protocol = PROTOCOL_BINARY
+                self.binary_failures = 0
+                print("Controller switched to binary protocol")
+                start = sync
+
+    def _find_binary_frame(self, buffer, start):
+        # a stray sync byte in a CSV stream is not enough, only switch once a whole frame checks out
+        if not self.use_binary:
+            return None
+        while True:
+            sync = buffer.find(BINARY_FRAME_SYNC, start)
+            if sync == -1:
+                return None
+            if len(buffer) - sync < BINARY_FRAME.size or decode_binary_frame(buffer, sync)[1] is not None:
+                return sync
+            start = sync + 1
+
+    def _decode_csv(self, buffer, start, limit):
+        while True:
+            end = buffer.find(b'\n', start, limit)
+            if end == -1:
+                break
+            self._handle_line(bytes(buffer[start:end]))
+            start = end + 1
+        return start
+
+    def _decode_binary(self, buffer, start):
+        view = memoryview(buffer)
+        frame_size = BINARY_FRAME.size
+        try:
+            while True:
+                sync = buffer.find(BINARY_FRAME_SYNC, start)
+                if sync == -1:
+                    sync = len(buffer)
+                if sync != start and self._binary_failed():
+                    return start
+                start = sync
+                if start == len(buffer):
+                    return start
+                if len(buffer) - start < frame_size:
+                    return start
+                seq, data = decode_binary_frame(view, start)
+                if data is None:
+                    self.parse_errors += 1
+                    if self._binary_failed():
+                        return start
+                    start += 1
+                    continue
+                self.binary_failures = 0
+                self._track_sequence(seq)
+                self.push_frame(data)
+                start += frame_size
+        finally:
+            view.release()
+
+    def _binary_failed(self):
+        self.binary_failures += 1
+        if self.binary_failures < BINARY_FALLBACK_FAILURES:
+            return False
+        self.protocol = PROTOCOL_CSV
+        self.binary_requests_sent = 0
+        print("Controller stopped sending binary frames, falling back to CSV")
+        return True
+
+    def _track_sequence(self, seq):
+        if self.last_seq is not None:
+            self.lost_frames += (seq - self.last_seq - 1) & 0xFF
+        self.last_seq = seq
+
+    def _handle_line(self, line):
+        line = line.strip()
+        if not line or line.startswith(CONTROLLER_HELLO):
+            return
+        try:
+            data = [int(x) for x in line.decode('ascii').split(',')]
+        except (ValueError, UnicodeDecodeError):
+            data = None
+        if (data is None or not is_controller_field_count(len(data)) or
+                not all(0 <= value <= AXIS_MAX for value in data[:axis_field_count(len(data))])):
+            self.parse_errors += 1
+            return
+        self.push_frame(data)
+
+    def push_frame(self, data):
+        now = time.perf_counter()
+        with self.lock:
+            self.lines_read += 1
+            self._rate_lines += 1
+            if not self.latest_frame_consumed:
+                self.dropped_lines += 1
+            self.latest_frame = data
+            self.latest_frame_time = now
+            self.latest_frame_consumed = False
+
+            self.field_count = len(data)
+            for field in range(axis_field_count(len(data)), len(data)):
+                pressed = 1 if data[field] == 1 else 0
+                if pressed and not self.button_states.get(field):
+                    if len(self.edge_events) == self.edge_events.maxlen:
+                        self.dropped_events += 1
+                    self.edge_events.append(field)
+                self.button_states[field] = pressed
+
+    def _update_read_rate(self):
+        now = time.perf_counter()
+        elapsed = now - self._rate_start
+        if elapsed >= RATE_WINDOW:
+            with self.lock:
+                self.read_rate = self._rate_lines / elapsed
+                self._rate_lines = 0
+            self._rate_start = now
+
+    def get_latest_frame(self):
+        with self.lock:
+            if self.latest_frame is None:
+                return None
+            if time.perf_counter() - self.latest_frame_time > FRAME_STALE_AFTER:
+                return None
+            self.latest_frame_consumed = True
+            return self.latest_frame
+
+    def pop_edge_events(self):
+        with self.lock:
+            events = list(self.edge_events)
+            self.edge_events.clear()
+        return events
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "read_rate": self.read_rate,
+                "lines_read": self.lines_read,
+                "parse_errors": self.parse_errors,
+                "dropped_lines": self.dropped_lines,
+                "dropped_events": self.dropped_events,
+                "lost_frames": self.lost_frames,
+                "protocol": self.protocol,
+            }
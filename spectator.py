@@ -0,0 +1,188 @@
+import pygame as pg
+import math
+import socket
+import json
+import threading
+import time
+from score_server import LENGTH_PREFIX
+from spectator_stream import SpectatorState, SPECTATOR_PORT, SPECTATOR_DEFAULT_RATE, PLAYER_SHOWS_ITEM
+from game_engine import (WIDTH, HEIGHT, GRIPPER_OFFSET, COLOR_DICT, ITEM_SCALE, GameState, player_layout,
+                         create_item_image, rotation_cache)
+from assets import assets
+
+GAME_SERVER_IP = None
+SPECTATOR_RATE = SPECTATOR_DEFAULT_RATE
+FPS = 60
+RECV_BUFFER_SIZE = 65536
+MAX_MESSAGE_SIZE = 65536
+PLAYER_SCALE = 1.5
+SCORE_COLORS = (COLOR_DICT["Blue"], COLOR_DICT["Red"])
+
+pg.init()
+screen = pg.display.set_mode((WIDTH, HEIGHT))
+pg.display.set_caption("Grabbing Game - Spectator")
+font_medium = pg.font.Font(None, 50)
+font_small = pg.font.Font(None, 36)
+clock = pg.time.Clock()
+
+STATE_UPDATED = pg.event.custom_type()
+
+state_lock = threading.Lock()
+spectator_state = SpectatorState()
+client_running = False
+client_socket = None
+
+def request_from_server(sock, request):
+    try:
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+    except socket.error as e:
+        print(f"Could not send request to game server: {e}")
+
+def handle_message(sock, payload):
+    with state_lock:
+        applied = spectator_state.apply(payload)
+    if applied:
+        pg.event.post(pg.event.Event(STATE_UPDATED))
+    else:
+        request_from_server(sock, {"keyframe": True})
+
+def connect_to_game_server():
+    global client_socket, client_running
+    client_running = True
+    buffer = bytearray()
+    while client_running:
+        if not client_socket:
+            try:
+                client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                client_socket.settimeout(1)
+                client_socket.connect((GAME_SERVER_IP, SPECTATOR_PORT))
+                print(f"Connected to spectator feed at {GAME_SERVER_IP}:{SPECTATOR_PORT}")
+                buffer.clear()
+                request_from_server(client_socket, {"rate": SPECTATOR_RATE})
+            except socket.error as e:
+                print(f"Could not connect to game server: {e}. Retrying in 2 seconds...")
+                client_socket = None
+                time.sleep(2)
+                continue
+
+        try:
+            data = client_socket.recv(RECV_BUFFER_SIZE)
+            if not data:
+                print("Game server disconnected. Attempting to reconnect...")
+                client_socket.close()
+                client_socket = None
+                continue
+            buffer += data
+            while len(buffer) >= LENGTH_PREFIX.size:
+                length, = LENGTH_PREFIX.unpack_from(buffer)
+                if length > MAX_MESSAGE_SIZE:
+                    raise ValueError(f"message of {length} bytes announced")
+                if len(buffer) < LENGTH_PREFIX.size + length:
+                    break
+                payload = bytes(buffer[LENGTH_PREFIX.size:LENGTH_PREFIX.size + length])
+                del buffer[:LENGTH_PREFIX.size + length]
+                handle_message(client_socket, payload)
+        except socket.timeout:
+            pass
+        except (socket.error, ValueError) as e:
+            print(f"Spectator feed error: {e}. Reconnecting...")
+            if client_socket:
+                client_socket.close()
+            client_socket = None
+            time.sleep(1)
+
+    if client_socket:
+        client_socket.close()
+    print("Spectator client stopped.")
+
+class FieldView:
+    def __init__(self):
+        self.player_count = None
+        self.background = None
+        self.basket_rects = []
+        self.player_images = []
+        self.item_image = create_item_image(ITEM_SCALE)
+        self.gripper_image = pg.Surface((8, 20), pg.SRCALPHA)
+        self.gripper_image.fill(COLOR_DICT["Black"])
+
+    def build(self, player_count):
+        self.player_count = player_count
+        self.background = pg.Surface((WIDTH, HEIGHT)).convert()
+        self.background.fill(COLOR_DICT["LightGray"])
+        pool = assets.get("assets/pool.png", (400, 400))
+        self.background.blit(pool, pool.get_rect(center=(WIDTH / 2, HEIGHT / 2)))
+        self.basket_rects = []
+        self.player_images = []
+        for _x, _y, _angle, basket_x, basket_y, team_assets in player_layout(player_count):
+            image_path, gripped_image_path, basket_image_path = team_assets
+            basket = assets.get(basket_image_path, (70, 100))
+            self.basket_rects.append(self.background.blit(basket, (basket_x, basket_y)))
+            self.player_images.append(((image_path, assets.get_scaled_by(image_path, PLAYER_SCALE)),
+                                       (gripped_image_path, assets.get_scaled_by(gripped_image_path, PLAYER_SCALE))))
+
+    def draw(self, surface, state):
+        player_count = len(state.players)
+        if not player_count:
+            surface.fill(COLOR_DICT["DarkGray"])
+            text = font_medium.render("Waiting for a match...", True, COLOR_DICT["White"])
+            surface.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+            return
+        if player_count != self.player_count:
+            self.build(player_count)
+        surface.blit(self.background, (0, 0))
+
+        item_size = self.item_image.get_width()
+        for x, y in state.items:
+            surface.blit(self.item_image, (x - item_size // 2, y - item_size // 2))
+
+        for index in range(player_count):
+            x, y, angle, flags = state.get_player(index)
+            path, image = self.player_images[index][1 if flags & PLAYER_SHOWS_ITEM else 0]
+            rotated = rotation_cache.get((path, PLAYER_SCALE), image, angle)
+            surface.blit(rotated, rotated.get_rect(center=(x, y)))
+            rad = math.radians(angle)
+            gripper = rotation_cache.get("gripper", self.gripper_image, angle)
+            surface.blit(gripper, gripper.get_rect(center=(x + math.cos(rad) * GRIPPER_OFFSET,
+                                                            y + math.sin(rad) * GRIPPER_OFFSET)))
+
+        for index, (score, basket_rect) in enumerate(zip(state.scores, self.basket_rects)):
+            score_text = font_small.render(str(score), True, SCORE_COLORS[index % 2])
+            surface.blit(score_text, score_text.get_rect(midbottom=(basket_rect.centerx, basket_rect.top - 4)))
+
+        seconds_left = math.ceil(state.time_left_ms / 1000)
+        clock_text = font_medium.render(f"Time: {seconds_left}", True, COLOR_DICT["Black"])
+        surface.blit(clock_text, clock_text.get_rect(midtop=(WIDTH // 2, 10)))
+        if state.game_state != GameState.PLAYING:
+            label = "GAME OVER" if state.game_state in (GameState.GAME_OVER, GameState.MAIN_MENU) else "GET READY"
+            status_text = font_medium.render(label, True, COLOR_DICT["White"])
+            surface.blit(status_text, status_text.get_rect(midbottom=(WIDTH // 2, HEIGHT - 10)))
+
+if __name__ == "__main__":
+    GAME_SERVER_IP = input("Enter IP Address ")
+    client_thread = threading.Thread(target=connect_to_game_server, daemon=True)
+    client_thread.start()
+    field_view = FieldView()
+
+    running = True
+    needs_redraw = True
+    while running:
+        events = [pg.event.wait(1000)] + pg.event.get()
+        for event in events:
+            if event.type == pg.QUIT:
+                running = False
+                client_running = False
+            if event.type == pg.KEYDOWN:
+                if event.key == pg.K_ESCAPE:
+                    running = False
+                    client_running = False
+            if event.type in (pg.NOEVENT, STATE_UPDATED, pg.WINDOWEXPOSED, pg.VIDEOEXPOSE):
+                needs_redraw = True
+
+        if needs_redraw:
+            with state_lock:
+                field_view.draw(screen, spectator_state)
+            pg.display.flip()
+            needs_redraw = False
+            clock.tick(FPS)
+
+    pg.quit()
@@ -0,0 +1,397 @@
+import selectors
+import socket
+import threading
+import json
+import struct
+import time
+from score_server import LENGTH_PREFIX, RECV_SIZE, SUBSCRIBER_INBOX_LIMIT, SELECT_TIMEOUT
+
+SPECTATOR_PORT = 12346
+SPECTATOR_DEFAULT_RATE = 20
+SPECTATOR_MAX_RATE = 60
+POSITION_SCALE = 8
+ANGLE_SCALE = 65536 / 360
+
+MESSAGE_KEYFRAME = ord('K')
+MESSAGE_DELTA = ord('D')
+CHANGED_CLOCK = 1
+CHANGED_SCORES = 2
+CHANGED_ITEMS = 4
+PLAYER_HAS_ITEM = 1
+PLAYER_SHOWS_ITEM = 2
+
+# type, match number, tick, game state, player count, time left in ms
+KEYFRAME_HEADER = struct.Struct('<BHIBBI')
+# type, match number, tick, base tick, game state, changed sections, changed players bitmask
+DELTA_HEADER = struct.Struct('<BHIIBBB')
+CLOCK = struct.Struct('<I')
+# x and y in 1/8 px, angle in 1/65536 turns, flags
+PLAYER = struct.Struct('<HHHB')
+ITEM_COUNT = struct.Struct('<H')
+
+class SpectatorSnapshot:
+    __slots__ = ("match_number", "tick", "game_state", "time_left_ms", "scores", "players", "items")
+
+    def __init__(self, match_number, tick, game_state, time_left_ms, scores, players, items):
+        self.match_number = match_number
+        self.tick = tick
+        self.game_state = game_state
+        self.time_left_ms = time_left_ms
+        self.scores = scores
+        self.players = players
+        self.items = items
+
+def quantize_position(value):
+    return max(0, min(0xFFFF, int(value * POSITION_SCALE)))
+
+def capture_snapshot(match, match_number, game_state):
+    states = match.states
+    players = []
+    for index in range(match.player_count):
+        flags = (PLAYER_HAS_ITEM if states.has_item[index] else 0) | (PLAYER_SHOWS_ITEM if states.shows_item[index] else 0)
+        players.append((quantize_position(states.x[index]), quantize_position(states.y[index]),
+                        int(states.angle[index] % 360 * ANGLE_SCALE) & 0xFFFF, flags))
+    return SpectatorSnapshot(match_number, match.tick_count & 0xFFFFFFFF, game_state,
+                             int(match.play_time.time_left * 1000), match.get_scores(), tuple(players),
+                             tuple(match.item_list.item_centers()))
+
+def _pack_scores(scores):
+    return struct.pack(f'<{len(scores)}H', *(min(score, 0xFFFF) for score in scores))
+
+def _pack_items(items):
+    flat = [max(0, min(coordinate, 0xFFFF)) for item in items for coordinate in item]
+    return ITEM_COUNT.pack(len(items)) + struct.pack(f'<{len(flat)}H', *flat)
+
+def encode_keyframe(snapshot):
+    parts = [KEYFRAME_HEADER.pack(MESSAGE_KEYFRAME, snapshot.match_number, snapshot.tick, snapshot.game_state,
+                                  len(snapshot.players), snapshot.time_left_ms),
+             _pack_scores(snapshot.scores)]
+    parts += [PLAYER.pack(*player) for player in snapshot.players]
+    parts.append(_pack_items(snapshot.items))
+    return b''.join(parts)
+
+def encode_delta(base, snapshot):
+    if base.match_number != snapshot.match_number or len(base.players) != len(snapshot.players):
+        return encode_keyframe(snapshot)
+    changed = 0
+    body = []
+    if snapshot.time_left_ms != base.time_left_ms:
+        changed |= CHANGED_CLOCK
+        body.append(CLOCK.pack(snapshot.time_left_ms))
+    if snapshot.scores != base.scores:
+        changed |= CHANGED_SCORES
+        body.append(_pack_scores(snapshot.scores))
+    player_mask = 0
+    for index, (player, base_player) in enumerate(zip(snapshot.players, base.players)):
+        if player != base_player:
+            player_mask |= 1 << index
+            body.append(PLAYER.pack(*player))
+    if snapshot.items != base.items:
+        changed |= CHANGED_ITEMS
+        body.append(_pack_items(snapshot.items))
+    if not changed and not player_mask and snapshot.game_state == base.game_state:
+        return None
+    return DELTA_HEADER.pack(MESSAGE_DELTA, snapshot.match_number, snapshot.tick, base.tick, snapshot.game_state,
+                             changed, player_mask) + b''.join(body)
+
+class SpectatorState:
+    def __init__(self):
+        self.match_number = None
+        self.tick = None
+        self.game_state = None
+        self.time_left_ms = 0
+        self.scores = []
+        self.players = []
+        self.items = []
+
+    def get_player(self, index):
+        x, y, angle, flags = self.players[index]
+        return x / POSITION_SCALE, y / POSITION_SCALE, angle / ANGLE_SCALE, flags
+
+    def apply(self, payload):
+        if payload[0] == MESSAGE_KEYFRAME:
+            (_type, self.match_number, self.tick, self.game_state, player_count,
+             self.time_left_ms) = KEYFRAME_HEADER.unpack_from(payload)
+            offset = KEYFRAME_HEADER.size
+            self.scores, offset = self._unpack_scores(payload, offset, player_count)
+            self.players = []
+            for _ in range(player_count):
+                self.players.append(PLAYER.unpack_from(payload, offset))
+                offset += PLAYER.size
+            self.items, offset = self._unpack_items(payload, offset)
+            return True
+
+        if payload[0] != MESSAGE_DELTA:
+            return False
+        _type, match_number, tick, base_tick, game_state, changed, player_mask = DELTA_HEADER.unpack_from(payload)
+        if match_number != self.match_number or base_tick != self.tick:
+            return False
+        offset = DELTA_HEADER.size
+        if changed & CHANGED_CLOCK:
+            self.time_left_ms, = CLOCK.unpack_from(payload, offset)
+            offset += CLOCK.size
+        if changed & CHANGED_SCORES:
+            self.scores, offset = self._unpack_scores(payload, offset, len(self.players))
+        for index in range(len(self.players)):
+            if player_mask & (1 << index):
+                self.players[index] = PLAYER.unpack_from(payload, offset)
+                offset += PLAYER.size
+        if changed & CHANGED_ITEMS:
+            self.items, offset = self._unpack_items(payload, offset)
+        self.tick = tick
+        self.game_state = game_state
+        return True
+
+    def _unpack_scores(self, payload, offset, count):
+        scores = list(struct.unpack_from(f'<{count}H', payload, offset))
+        return scores, offset + 2 * count
+
+    def _unpack_items(self, payload, offset):
+        count, = ITEM_COUNT.unpack_from(payload, offset)
+        offset += ITEM_COUNT.size
+        flat = struct.unpack_from(f'<{2 * count}H', payload, offset)
+        return list(zip(flat[0::2], flat[1::2])), offset + 4 * count
+
+class Spectator:
+    def __init__(self, spectator_id, sock, address):
+        self.id = spectator_id
+        self.sock = sock
+        self.address = address
+        self.outbox = None
+        self.inbox = bytearray()
+        self.interval = 1 / SPECTATOR_DEFAULT_RATE
+        self.next_send = 0
+        self.baseline = None
+        self.sent_messages = 0
+        self.sent_bytes = 0
+
+class SpectatorServer:
+    def __init__(self, host, port=SPECTATOR_PORT):
+        self.host = host
+        self.port = port
+        self.selector = None
+        self.server_socket = None
+        self.spectators = {}
+        self.next_spectator_id = 1
+        self.latest = None
+        # when the next spectator is due; the render thread skips capturing snapshots until then
+        self.next_capture = 0
+        self.last_match = None
+        self.match_number = 0
+        self.wake_reader, self.wake_writer = socket.socketpair()
+        self.wake_reader.setblocking(False)
+        self.wake_writer.setblocking(False)
+        self.running = False
+        self.thread = None
+        self.keyframes_sent = 0
+        self.deltas_sent = 0
+        self.encodes = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake()
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def get_spectator_count(self):
+        return len(self.spectators)
+
+    def get_stats(self):
+        return {"spectators": len(self.spectators), "keyframes": self.keyframes_sent, "deltas": self.deltas_sent,
+                "encodes": self.encodes}
+
+    def publish_match(self, match, game_state):
+        if not self.spectators or match is None:
+            return
+        if match is not self.last_match:
+            self.last_match = match
+            self.match_number = (self.match_number + 1) & 0xFFFF
+        latest = self.latest
+        if latest and latest.tick == match.tick_count and latest.game_state == game_state \
+                and latest.match_number == self.match_number:
+            return
+        if time.perf_counter() < self.next_capture:
+            return
+        self.latest = capture_snapshot(match, self.match_number, game_state)
+        self._wake()
+
+    def _wake(self):
+        try:
+            self.wake_writer.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def _run(self):
+        self.selector = selectors.DefaultSelector()
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.server_socket.bind((self.host, self.port))
+            self.server_socket.listen()
+            self.server_socket.setblocking(False)
+            print(f"Spectator server listening on {self.host}:{self.port}")
+        except socket.error as e:
+            print(f"Failed to start spectator server: {e}")
+            self.server_socket.close()
+            self.running = False
+            return
+
+        self.selector.register(self.server_socket, selectors.EVENT_READ)
+        self.selector.register(self.wake_reader, selectors.EVENT_READ)
+
+        while self.running:
+            for key, mask in self.selector.select(self._select_timeout()):
+                if key.fileobj is self.server_socket:
+                    self._accept()
+                elif key.fileobj is self.wake_reader:
+                    self._drain_wakeups()
+                else:
+                    self._service_spectator(key.data, mask)
+            self._send_due()
+
+        for spectator in list(self.spectators.values()):
+            self._disconnect(spectator)
+        self.selector.close()
+        self.server_socket.close()
+        print("Spectator server stopped.")
+
+    def _select_timeout(self):
+        latest = self.latest
+        now = time.perf_counter()
+        timeout = SELECT_TIMEOUT
+        for spectator in self.spectators.values():
+            if spectator.outbox is None and spectator.baseline is not latest:
+                timeout = min(timeout, max(0, spectator.next_send - now))
+        return timeout
+
+    def _accept(self):
+        try:
+            conn, addr = self.server_socket.accept()
+        except (BlockingIOError, socket.error):
+            return
+        conn.setblocking(False)
+        spectator = Spectator(self.next_spectator_id, conn, addr)
+        self.next_spectator_id += 1
+        self.spectators[spectator.id] = spectator
+        self.next_capture = 0
+        self.selector.register(conn, selectors.EVENT_READ, spectator)
+        print(f"Spectator connected from {addr}")
+
+    def _drain_wakeups(self):
+        try:
+            while self.wake_reader.recv(RECV_SIZE):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _send_due(self):
+        latest = self.latest
+        if latest is not None:
+            self._send_snapshot(latest)
+        waiting = [spectator.next_send for spectator in self.spectators.values() if spectator.outbox is None]
+        self.next_capture = min(waiting, default=float('inf'))
+
+    def _send_snapshot(self, latest):
+        now = time.perf_counter()
+        encoded = {}
+        for spectator in list(self.spectators.values()):
+            if spectator.outbox is not None or spectator.baseline is latest or now < spectator.next_send:
+                continue
+            base = spectator.baseline
+            key = id(base) if base else None
+            if key not in encoded:
+                encoded[key] = encode_keyframe(latest) if base is None else encode_delta(base, latest)
+                self.encodes += 1
+            payload = encoded[key]
+            spectator.next_send = now + spectator.interval
+            if payload is None:
+                continue
+            if payload[0] == MESSAGE_KEYFRAME:
+                self.keyframes_sent += 1
+            else:
+                self.deltas_sent += 1
+            spectator.baseline = latest
+            spectator.outbox = memoryview(LENGTH_PREFIX.pack(len(payload)) + payload)
+            spectator.sent_bytes += len(spectator.outbox)
+            self._flush(spectator)
+
+    def _service_spectator(self, spectator, mask):
+        if mask & selectors.EVENT_READ:
+            try:
+                data = spectator.sock.recv(RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                data = None
+            except socket.error:
+                data = b''
+            if data == b'':
+                print(f"Spectator {spectator.address} disconnected.")
+                self._disconnect(spectator)
+                return
+            if data:
+                spectator.inbox += data
+                if not self._handle_requests(spectator):
+                    return
+        if mask & selectors.EVENT_WRITE:
+            self._flush(spectator)
+
+    def _handle_requests(self, spectator):
+        while True:
+            end = spectator.inbox.find(b'\n')
+            if end == -1:
+                break
+            line = bytes(spectator.inbox[:end])
+            del spectator.inbox[:end + 1]
+            try:
+                request = json.loads(line)
+                rate = request.get("rate")
+                keyframe = request.get("keyframe")
+                rate = None if rate is None else float(rate)
+            except (ValueError, TypeError, AttributeError):
+                print(f"Ignoring invalid request from spectator {spectator.address}: {line!r}")
+                continue
+            if rate:
+                spectator.interval = 1 / max(1.0, min(rate, SPECTATOR_MAX_RATE))
+            if keyframe:
+                spectator.baseline = None
+        if len(spectator.inbox) > SUBSCRIBER_INBOX_LIMIT:
+            print(f"Spectator {spectator.address} sent an oversized request, disconnecting.")
+            self._disconnect(spectator)
+            return False
+        return True
+
+    def _flush(self, spectator):
+        message = spectator.outbox
+        if message is not None:
+            try:
+                sent = spectator.sock.send(message)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except socket.error as e:
+                print(f"Error sending data to spectator {spectator.address}: {e}. Closing connection.")
+                self._disconnect(spectator)
+                return
+            if sent < len(message):
+                spectator.outbox = message[sent:]
+            else:
+                spectator.outbox = None
+                spectator.sent_messages += 1
+
+        events = selectors.EVENT_READ
+        if spectator.outbox is not None:
+            events |= selectors.EVENT_WRITE
+        self.selector.modify(spectator.sock, events, spectator)
+
+    def _disconnect(self, spectator):
+        if self.spectators.pop(spectator.id, None) is None:
+            return
+        try:
+            self.selector.unregister(spectator.sock)
+        except (KeyError, ValueError):
+            pass
+        spectator.sock.close()